@@ -0,0 +1,229 @@
+"""
+Offline benchmark of every scraper over the page fixtures in bench/fixtures.py.
+
+Usage: python -m bench [--repeat N] [--only amazon,nvidia] [--cassette DIR] [--save FILE] [--compare FILE]
+
+Scrapers run against the fixtures without network access, HTTP cache or
+article store. For each scraper the fastest of the repeats is reported:
+  discovery  listing/RSS fetch and parse, entry selection (total - extract - serialize)
+  extract    article page parse and text extraction (fetch_article_content etc.)
+  serialize  feed writing
+  pages/s    fixture pages served per second of total time
+  spread     how much slower the median run was than the fastest
+  peak KiB   peak Python memory during one run (tracemalloc, in a separate run)
+--cassette replays pages recorded with run_feeds.py --record instead of the
+built-in fixtures. --save writes the results as JSON; --compare prints the
+change against a saved file.
+"""
+import argparse
+import asyncio
+import contextlib
+import gc
+import importlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from curl_cffi.requests.exceptions import HTTPError
+
+from bench.fixtures import build_pages
+from scrapers import cassette, config, transport
+
+# module, class, methods that fetch and extract one article
+SCRAPERS = [
+    ("openai", "OpenAIScraper", ["fetch_article_content"]),
+    ("nvidia", "NvidiaScraper", ["fetch_article"]),
+    ("google_ai", "GoogleAIScraper", ["fetch_description"]),
+    ("amd", "AMDScraper", ["fetch_description"]),
+    ("perplexity", "PerplexityScraper", ["fetch_article"]),
+    ("palantir", "PalantirScraper", []),
+    ("amazon", "AmazonScraper", ["fetch_article_content"]),
+    ("elevenlabs", "ElevenLabsScraper", ["fetch_article_details"]),
+    ("anthropic", "AnthropicScraper", ["fetch_description"]),
+    ("reallysimpleai", "ReallySimpleAIScraper", ["clean_html_content"]),
+]
+
+class FixtureResponse:
+    """The parts of a curl_cffi response the scrapers use."""
+
+    def __init__(self, url, body):
+        self.url = url
+        self.status_code = 200 if body is not None else 404
+        self.content = (body or "Not Found").encode("utf-8")
+        self.headers = {"content-type": "text/html; charset=utf-8"}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise HTTPError(f"HTTP Error {self.status_code}: {self.url}")
+
+def _timed(func, stage, timings):
+    if asyncio.iscoroutinefunction(func):
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                timings[stage] += time.perf_counter() - start
+    else:
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings[stage] += time.perf_counter() - start
+    return wrapper
+
+@contextlib.contextmanager
+def instrumented(module, scraper_class, methods, pages, run):
+    """
+    Serves the fixtures instead of the network and times the extraction
+    methods and write_feed of one scraper, accumulating into run.
+    """
+    async def get(url, **kwargs):
+        run["pages"] += 1
+        return FixtureResponse(url, pages.get(url))
+
+    def write_feed(feed, path, *args, **kwargs):
+        run["outputs"].append(path)
+        return original_write_feed(feed, path, *args, **kwargs)
+
+    original_get = transport.get
+    original_write_feed = module.write_feed
+    originals = {name: scraper_class.__dict__[name] for name in methods}
+    transport.get = get
+    module.write_feed = _timed(write_feed, "serialize", run)
+    for name, method in originals.items():
+        setattr(scraper_class, name, _timed(method, "extract", run))
+    try:
+        yield
+    finally:
+        transport.get = original_get
+        module.write_feed = original_write_feed
+        for name, method in originals.items():
+            setattr(scraper_class, name, method)
+
+def load_cassette(directory):
+    """{url: body} of the successful responses in a cassette."""
+    pages = {}
+    for url in cassette.recorded_urls(directory):
+        meta, body = cassette.load(directory, url)
+        if meta["status"] == 200:
+            pages[url] = body.decode("utf-8", errors="replace")
+    return pages
+
+def run_once(module, scraper_class, methods, pages, trace_memory=False):
+    run = {"pages": 0, "extract": 0.0, "serialize": 0.0, "outputs": []}
+    with instrumented(module, scraper_class, methods, pages, run):
+        gc.collect()
+        if trace_memory:
+            tracemalloc.start()
+        else:
+            # Collections during the run are a large source of noise between repeats
+            gc.disable()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                scraper_class().generate_feed()
+        finally:
+            run["total"] = time.perf_counter() - start
+            if trace_memory:
+                run["peak"] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            gc.enable()
+    run["discovery"] = run["total"] - run["extract"] - run["serialize"]
+    run["output_bytes"] = sum(os.path.getsize(path) for path in run.pop("outputs"))
+    return run
+
+def benchmark(module_name, class_name, methods, pages, repeat):
+    module = importlib.import_module(f"scrapers.{module_name}")
+    scraper_class = getattr(module, class_name)
+    run_once(module, scraper_class, methods, pages)  # warm-up
+    runs = [run_once(module, scraper_class, methods, pages) for _ in range(repeat)]
+    peak = run_once(module, scraper_class, methods, pages, trace_memory=True)["peak"]
+
+    # Noise only ever adds time, so the fastest run is the most repeatable figure
+    best = min(runs, key=lambda run: run["total"])
+    result = {stage: best[stage] for stage in ("total", "discovery", "extract", "serialize")}
+    totals = [run["total"] for run in runs]
+    result["spread"] = (statistics.median(totals) - result["total"]) / result["total"]
+    result["pages"] = runs[0]["pages"]
+    result["pages_per_s"] = result["pages"] / result["total"]
+    result["peak_kib"] = peak / 1024
+    result["output_bytes"] = runs[0]["output_bytes"]
+    return result
+
+def print_report(results, baseline=None):
+    header = f"{'scraper':24s} {'total ms':>9s} {'discovery':>9s} {'extract':>9s} {'serialize':>9s} {'spread':>7s} {'pages':>5s} {'pages/s':>8s} {'peak KiB':>9s}"
+    if baseline:
+        header += f" {'vs base':>8s}"
+    print(header)
+    for name, r in results.items():
+        line = (f"{name:24s} {r['total'] * 1000:9.1f} {r['discovery'] * 1000:9.1f} {r['extract'] * 1000:9.1f} "
+                f"{r['serialize'] * 1000:9.1f} {r['spread'] * 100:6.1f}% {r['pages']:5d} {r['pages_per_s']:8.1f} {r['peak_kib']:9.0f}")
+        if baseline and name in baseline:
+            line += f" {(r['total'] / baseline[name]['total'] - 1) * 100:+7.1f}%"
+        print(line)
+    total = sum(r["total"] for r in results.values())
+    print(f"{'all scrapers':24s} {total * 1000:9.1f}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Benchmark the scrapers offline over recorded page fixtures.")
+    parser.add_argument("--repeat", "-n", type=int, default=5,
+                        help="Timed runs per scraper; the fastest is reported (default: 5)")
+    parser.add_argument("--only", default="",
+                        help="Comma-separated scraper modules to run, e.g. amazon,nvidia (default: all)")
+    parser.add_argument("--cassette", metavar="DIR",
+                        help="Use the pages recorded in this cassette instead of the built-in fixtures")
+    parser.add_argument("--save", metavar="FILE", help="Write the results as JSON to FILE")
+    parser.add_argument("--compare", metavar="FILE", help="Compare against results saved with --save")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    only = {name.strip() for name in args.only.split(",") if name.strip()}
+    selected = [entry for entry in SCRAPERS if not only or entry[0] in only]
+    if not selected:
+        print(f"No scrapers match --only {args.only}")
+        return 2
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    pages = load_cassette(args.cassette) if args.cassette else build_pages()
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        config.override("CACHE_DIR", os.path.join(workdir, ".cache"))
+        config.override("HTTP_CACHE_MAX_MB", 0)
+        config.override("REFRESH_ARTICLES", True)
+        cwd = os.getcwd()
+        os.makedirs(os.path.join(workdir, "feed"))
+        os.chdir(workdir)
+        try:
+            for module_name, class_name, methods in selected:
+                results[class_name] = benchmark(module_name, class_name, methods, pages, args.repeat)
+        finally:
+            os.chdir(cwd)
+
+    print_report(results, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": sys.version.split()[0], "repeat": args.repeat, "results": results}, f, indent=2)
+        print(f"Saved results to {args.save}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Page fixtures for the benchmark, one set per source.
+
+The pages reproduce the markup each scraper reads on the real sites: Amazon
+promo cards, the Palantir __NEXT_DATA__ JSON, NVIDIA entry-content, Framer
+paragraphs on Perplexity and so on. HTML pages are padded with navigation,
+inline state and footer boilerplate so that parsing costs resemble the real
+pages. Dates are relative to midnight UTC of the current day, so the lookback
+window selects the same articles on every run.
+"""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import html
+import json
+
+LOREM = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore "
+         "et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris. ")
+
+def _days_ago(today, days):
+    return today - timedelta(days=days)
+
+def _openai(pages, today):
+    items = ""
+    for i in range(35):
+        link = f"https://openai.com/index/post-{i}/"
+        items += (f"<item><title>OpenAI post {i} &amp; more</title><link>{link}</link><description>Short {i}</description>"
+                  f"<pubDate>{format_datetime(_days_ago(today, i * 3))}</pubDate></item>")
+        pages[link] = (f"<html><body><main><div class='ui-block ui-block--text'><p>{LOREM * 3} post {i} &lt;b&gt;</p>"
+                       f"<p>{LOREM}</p></div></main></body></html>")
+    pages["https://openai.com/news/rss.xml"] = f"<?xml version='1.0'?><rss version='2.0'><channel><title>OpenAI</title>{items}</channel></rss>"
+
+def _nvidia(pages, today):
+    cards = ""
+    for i in range(12):
+        link = f"https://blogs.nvidia.com/blog/post-{i}/"
+        cards += (f"<article><a class='aggregation-card-link' href='{link}'></a><h3 class='entry-title'><a href='{link}'>NVIDIA {i}</a></h3>"
+                  f"<div class='entry-excerpt'><p>Excerpt {i}</p></div></article>")
+        pages[link] = (f"<html><head><meta property='article:published_time' content='{_days_ago(today, i * 7).isoformat()}'/></head><body>"
+                       f"<div class='entry-content'><span class='bsf-rt-reading-time'>3 min</span><p>{LOREM * 4}</p>"
+                       f"<p>NV {i} ]]&gt; tricky</p><script>x()</script></div></body></html>")
+    pages["https://blogs.nvidia.com/blog/category/generative-ai/"] = f"<html><body>{cards}</body></html>"
+
+def _google(pages, today):
+    items = ""
+    for i in range(20):
+        link = f"https://blog.google/technology/ai/post-{i}/"
+        items += (f"<item><title>Google {i}</title><link>{link}</link><description>RSS desc {i}</description>"
+                  f"<pubDate>{format_datetime(_days_ago(today, i * 4))}</pubDate></item>")
+        # Every fifth article page is missing, so the RSS description is used
+        if i % 5 != 4:
+            pages[link] = (f"<html><body><div class='uni-blog-article-container'><uni-reading-time>5</uni-reading-time>"
+                           f"<p>{LOREM * 5} g{i}</p><div class='uni-social-share'>share</div></div></body></html>")
+    pages["https://blog.google/technology/ai/rss/"] = f"<?xml version='1.0'?><rss version='2.0'><channel>{items}</channel></rss>"
+
+def _amd(pages, today):
+    items = ""
+    for i in range(25):
+        link = f"https://ir.amd.com/news-events/press-releases/detail/{i}/amd-news"
+        items += (f"<item><title>AMD {i}</title><link>{link}</link><description>AMD RSS {i}</description>"
+                  f"<pubDate>{format_datetime(_days_ago(today, i * 5))}</pubDate></item>")
+        pages[link] = (f"<html><body><article class='full-news-article'><h1 class='article-heading'>AMD {i}</h1>"
+                       f"<p class='spr-ir-news-article-date'>date</p><p>{LOREM * 6} amd{i}</p><pre>Contact</pre>"
+                       f"<div class='related-documents-line'>docs</div></article></body></html>")
+    pages["https://ir.amd.com/news-events/press-releases/rss"] = f"<?xml version='1.0'?><rss version='2.0'><channel>{items}</channel></rss>"
+
+def _perplexity(pages, today):
+    links = ""
+    for i in range(20):
+        links += f"<a href='./hub/blog/post-{i:02d}'>p{i}</a>"
+        published = _days_ago(today, i * 6).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        pages[f"https://www.perplexity.ai/hub/blog/post-{i:02d}"] = (
+            f"<html><head><title>Perplexity {i}</title><script type='application/ld+json'>"
+            f"{{\"datePublished\": \"{published}\"}}</script></head><body>"
+            f"<div><p class='framer-text'>Written by Perplexity Team Published on Dec 4, 2025</p>"
+            f"<p class='framer-text'>{LOREM * 2} px{i}</p><p class='framer-text'>{LOREM}</p></div>"
+            f"<div><p class='framer-text'>{LOREM * 2} duplicate</p></div></body></html>")
+    pages["https://www.perplexity.ai/hub"] = f"<html><head><title>Hub</title></head><body>{links}</body></html>"
+
+def _palantir(pages, today):
+    entries = [{"fields": {
+        "headline": f"Palantir {i} <News>",
+        "date": _days_ago(today, i * 9).strftime('%Y-%m-%dT%H:%M-07:00'),
+        "link": {"fields": {"url": f"https://investors.palantir.com/news/{i}"}}
+    }} for i in range(20)]
+    data = {"props": {"pageProps": {"page": {"fields": {"blocks": [
+        {"fields": {"blocks": [{"fields": {"customEntries": entries}}]}}
+    ]}}}}}
+    pages["https://www.palantir.com/newsroom/press-releases/"] = (
+        f"<html><body><script id='__NEXT_DATA__' type='application/json'>{json.dumps(data)}</script></body></html>")
+
+def _amazon(pages, today):
+    cards = ""
+    for i in range(15):
+        link = f"https://www.aboutamazon.com/news/ai/post-{i}"
+        date = _days_ago(today, i * 6).strftime("%b. %d, %Y").replace("May.", "May")
+        cards += (f"<div class='promo-card-v2 promo-card-v2--articlerouting'><div class='promo-card-v2__title'><a href='{link}'>Amazon {i}</a></div>"
+                  f"<div class='promo-card-v2__excerpt'>Excerpt {i}</div><div class='card-meta__published'>{date}</div></div>")
+        pages[link] = (f"<html><body><div class='ArticlePage-articleBody'><div class='contentContainer'><div class='contentItem-role-text'>{LOREM * 4} az{i}</div></div>"
+                       f"<div class='contentContainer'><h2>Heading {i}</h2></div><div class='contentContainer'><ul><li>one</li><li>two</li></ul></div></div></body></html>")
+    pages["https://www.aboutamazon.com/artificial-intelligence-ai-news"] = (
+        f"<html><body>{cards}<div class='promo-card-v2--listlandscape'>x</div></body></html>")
+
+def _elevenlabs(pages, today):
+    links = ""
+    for i in range(15):
+        links += f"<a href='/blog/post-{i}'><h3>ElevenLabs {i}</h3></a>"
+        published = _days_ago(today, i * 8).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        pages[f"https://elevenlabs.io/blog/post-{i}"] = (
+            f"<html><body><time datetime='{published}'>x</time>"
+            f"<div class='rich-text-blog'><h2>Intro</h2><p>{LOREM * 3} el{i}</p><ul><li>a</li><li>b</li></ul></div></body></html>")
+    links += "<a href='/blog/category/news'>cat</a><a href='/blog'>blog</a>"
+    pages["https://elevenlabs.io/blog"] = f"<html><body>{links}</body></html>"
+
+def _anthropic(pages, today):
+    links = ""
+    for i in range(15):
+        # Every third card has no summary, so its article page is fetched
+        summary = "" if i % 3 == 0 else f"<p>Anthropic summary {i}</p>"
+        links += f"<a href='/news/post-{i}'><h3>Anthropic {i}</h3><time>{_days_ago(today, i * 7).strftime('%b %d, %Y')}</time>{summary}</a>"
+        pages[f"https://www.anthropic.com/news/post-{i}"] = (
+            f"<html><head><meta name='description' content='Meta description {i}'/></head><body><main><p>{LOREM}</p></main></body></html>")
+    pages["https://www.anthropic.com/news"] = f"<html><body>{links}</body></html>"
+
+def _reallysimpleai(pages, today):
+    items = ""
+    for i in range(10):
+        body = html.escape(f"<div><p>{LOREM} rs{i}</p><div aria-label='Message actions'><button>Copy</button></div></div>")
+        items += (f"<item><title>RSAI {i}</title><link>https://reallysimpleai.blogspot.com/p/{i}.html</link>"
+                  f"<description>{body}</description><pubDate>{format_datetime(_days_ago(today, i * 10))}</pubDate></item>")
+    pages["https://reallysimpleai.blogspot.com/feeds/posts/default?alt=rss"] = (
+        f"<?xml version='1.0'?><rss version='2.0'><channel>{items}</channel></rss>")
+
+def _boilerplate():
+    nav = "<nav>" + "".join(
+        f"<div class='menu-item'><a href='/section/{i}'><span>Section {i}</span></a><ul>"
+        + "".join(f"<li><a href='/section/{i}/{j}'>Item {j}</a></li>" for j in range(8))
+        + "</ul></div>" for i in range(60)) + "</nav>"
+    state = "<script>window.__STATE__ = " + json.dumps({f"k{i}": [f"value {j}" for j in range(10)] for i in range(400)}) + ";</script>"
+    footer = "<footer>" + "".join(
+        f"<div class='col'><h4>Col {i}</h4>"
+        + "".join(f"<p><a href='/f/{i}/{j}'>Footer link {j}</a></p>" for j in range(15))
+        + "</div>" for i in range(12)) + "</footer>"
+    return nav + state, footer
+
+def build_pages():
+    """Returns {url: body} for every page the scrapers request."""
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    pages = {}
+    for add in (_openai, _nvidia, _google, _amd, _perplexity, _palantir,
+                _amazon, _elevenlabs, _anthropic, _reallysimpleai):
+        add(pages, today)
+
+    header, footer = _boilerplate()
+    for url, body in pages.items():
+        if "<body>" in body:
+            pages[url] = body.replace("<body>", "<body>" + header, 1).replace("</body>", footer + "</body>", 1)
+    return pages
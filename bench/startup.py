@@ -0,0 +1,65 @@
+"""
+Import-time budget of run_feeds.py.
+
+Usage: python -m bench.startup [--repeat N] [--budget MS] [--top N]
+
+Imports run_feeds in fresh interpreters with python -X importtime and reports
+the fastest of the repeats, excluding interpreter startup. The scraper modules,
+curl_cffi and the replay server are imported on first use (scrapers/registry.py),
+so they must not show up here. Exits with 1 when the import takes longer than
+the budget.
+"""
+import argparse
+import subprocess
+import sys
+
+# Measured at about 30 ms; importing every scraper up front took about 245 ms.
+BUDGET_MS = 75
+
+def measure():
+    """
+    Imports run_feeds in a fresh interpreter. Returns the total in ms and
+    {module: self ms} for run_feeds and everything it imported.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import run_feeds"],
+                            capture_output=True, text=True, check=True)
+    # A module is reported after everything it imported. The last top-level
+    # module is run_feeds; those before it are site and its .pth imports.
+    pending = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        pending[name.strip()] = int(own) / 1000
+        if not name.startswith("   "):
+            modules, pending = pending, {}
+    return int(cumulative) / 1000, modules
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.startup", description="Check the import time of run_feeds.py.")
+    parser.add_argument("--repeat", "-n", type=int, default=5,
+                        help="Fresh interpreters to measure; the fastest is reported (default: 5)")
+    parser.add_argument("--budget", type=float, default=BUDGET_MS, metavar="MS",
+                        help=f"Fail above this many milliseconds (default: {BUDGET_MS})")
+    parser.add_argument("--top", type=int, default=10, metavar="N",
+                        help="Number of slowest imports to list (default: 10)")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    total, modules = min((measure() for _ in range(args.repeat)), key=lambda run: run[0])
+    print(f"{'module':40s} {'self ms':>8s}")
+    for name in sorted(modules, key=modules.get, reverse=True)[:args.top]:
+        print(f"{name:40s} {modules[name]:8.1f}")
+
+    print(f"import run_feeds: {total:.1f} ms (fastest of {args.repeat}, budget {args.budget:g} ms)")
+    if total > args.budget:
+        print("Over budget; import the slow module where it is used instead of at the top of run_feeds.py")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,53 +1,54 @@
+import argparse
+import contextlib
+import cProfile
+import multiprocessing
 import os
-import importlib.util
 import sys
-from scrapers.elevenlabs import ElevenLabsScraper
-from scrapers.amazon import AmazonScraper
-from scrapers.palantir import PalantirScraper
-from scrapers.anthropic import AnthropicScraper
-from scrapers.perplexity import PerplexityScraper
-from scrapers.amd import AMDScraper
-from scrapers.google_ai import GoogleAIScraper
-from scrapers.nvidia import NvidiaScraper
-from scrapers.openai import OpenAIScraper
-from scrapers.reallysimpleai import ReallySimpleAIScraper
-
-def run_scrapers():
-    # The original code dynamically discovers scrapers in a directory.
-    # The instruction implies a change to an explicit list of modules.
-    # This change replaces the directory scanning logic with a fixed list.
-    scrapers = [
-        OpenAIScraper(),
-        NvidiaScraper(),
-        GoogleAIScraper(),
-        AMDScraper(),
-        PerplexityScraper(),
-        PalantirScraper(),
-        AmazonScraper(),
-        ElevenLabsScraper(),
-        AnthropicScraper(),
-        ReallySimpleAIScraper()
-    ]
-
-    print(f"Running specific scrapers: {[s.__class__.__name__ for s in scrapers]}...")
-
-    # Get disabled scrapers from environment variable
-    disabled_env = os.environ.get("DISABLED_SCRAPERS", "")
-    disabled_scrapers = [s.strip() for s in disabled_env.split(",") if s.strip()]
-    if disabled_scrapers:
-        print(f"Disabled scrapers: {disabled_scrapers}")
-    
-    success = True
-    for scraper in scrapers:
-        name = scraper.__class__.__name__
-        
-        if name in disabled_scrapers:
-            print(f"Skipping scraper: {name} (Disabled via config)")
-            print("-" * 20)
-            continue
+import time
+# Scraper modules, the HTTP transport and the replay server are imported on first use
+# (see scrapers/registry.py), so selecting a few scrapers does not pay for the others.
+from scrapers import config, deadline, httpcache, metrics, publish, registry, trace
+
+@contextlib.contextmanager
+def profiling(name):
+    """
+    With PROFILE_DIR set, profiles the block into PROFILE_DIR/<name>.prof and
+    prints the functions with the most own time.
+    """
+    if not config.PROFILE_DIR:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(config.PROFILE_DIR, exist_ok=True)
+        path = os.path.join(config.PROFILE_DIR, f"{name}.prof")
+        profiler.dump_stats(path)
+        print_profile_summary(name, profiler, path)
 
-        print(f"Running scraper: {name}")
-        
+def print_profile_summary(name, profiler, path):
+    profiler.create_stats()
+    rows = sorted(profiler.stats.items(), key=lambda row: row[1][2], reverse=True)[:config.PROFILE_TOP]
+    print(f"Profile of {name} written to {path}. Top {len(rows)} functions by own time:")
+    print(f"{'tottime':>9s} {'cumtime':>9s} {'calls':>9s}  function")
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in rows:
+        # Built-ins have no source location
+        location = f" ({os.path.basename(filename)}:{line})" if line else ""
+        print(f"{tottime:9.3f} {cumtime:9.3f} {calls:9d}  {function}{location}")
+
+def run_scraper(scraper):
+    """
+    Runs a single scraper in the current process. Returns True on success.
+    Its metrics are saved for metrics.write_report().
+    """
+    name = scraper.__class__.__name__
+    print(f"Running scraper: {name}")
+
+    with metrics.collecting(name), profiling(name), trace.scraper(name):
         try:
             if hasattr(scraper, "generate_feed") and callable(scraper.generate_feed):
                 scraper.generate_feed()
@@ -56,22 +57,182 @@ def run_scrapers():
                 print(f"Skipping {name}: No 'generate_feed' method found.")
         except Exception as e:
             print(f"Error running {name}: {e}")
+            return False
+    return True
+
+def _scraper_worker(name):
+    """Entry point of a worker process: exit code 0 on success, 1 on failure."""
+    sys.exit(0 if run_scraper(registry.load(name)()) else 1)
+
+def run_parallel(names, jobs, timeout):
+    """
+    Runs each named scraper in its own worker process, at most `jobs` at a time.
+    A worker still running after `timeout` seconds is terminated and counted as failed.
+    Returns a dict mapping scraper name to its exit code (None if it timed out).
+    """
+    pending = list(names)
+    running = {}  # name -> (process, start time)
+    exit_codes = {}
+
+    while pending or running:
+        while pending and len(running) < jobs:
+            name = pending.pop(0)
+            process = multiprocessing.Process(target=_scraper_worker, args=(name,), name=name)
+            process.start()
+            running[name] = (process, time.monotonic())
+
+        for name, (process, started) in list(running.items()):
+            if not process.is_alive():
+                process.join()
+                exit_codes[name] = process.exitcode
+                print(f"Worker {name} finished with exit code {process.exitcode} after {time.monotonic() - started:.1f}s")
+                del running[name]
+            elif time.monotonic() - started > timeout:
+                print(f"Worker {name} exceeded {timeout}s timeout, terminating.")
+                process.terminate()
+                process.join(5)
+                if process.is_alive():
+                    process.kill()
+                    process.join()
+                exit_codes[name] = None
+                del running[name]
+
+        time.sleep(0.1)
+
+    return exit_codes
+
+def enabled_scrapers(only=None, skip=None):
+    """
+    Returns the names of the scrapers to run: those in `only` (default all),
+    minus those in `skip` and in DISABLED_SCRAPERS. Nothing is imported yet.
+    """
+    enabled = registry.select(only, skip)
+
+    disabled_env = os.environ.get("DISABLED_SCRAPERS", "")
+    if disabled_env.strip():
+        print(f"Disabled scrapers: {disabled_env}")
+    not_disabled = registry.select()
+    for name in registry.names():
+        if name not in enabled:
+            reason = "not selected" if name in not_disabled else "Disabled via config"
+            print(f"Skipping scraper: {name} ({reason})")
+
+    print(f"Running specific scrapers: {enabled}...")
+    print("-" * 20)
+    return enabled
+
+async def arun_scrapers(only=None, skip=None):
+    """
+    Runs all enabled scrapers concurrently on the current event loop via their
+    agenerate_feed() coroutines, then regenerates feed/index.html.
+    Returns True if every scraper succeeded.
+    """
+    import asyncio  # only the --async path needs it; kept off the startup path
+
+    scrapers = [registry.load(name)() for name in enabled_scrapers(only, skip)]
+    metrics.clear_partials()
+    trace.clear_partials()
+    published = publish.snapshot()
+
+    async def collect(scraper):
+        # Runs in its own task, so the collector is not shared with the other scrapers
+        name = scraper.__class__.__name__
+        with metrics.collecting(name), trace.scraper(name):
+            return await scraper.agenerate_feed()
+
+    results = await asyncio.gather(*(collect(scraper) for scraper in scrapers), return_exceptions=True)
+
+    success = True
+    statuses = {}
+    for scraper, result in zip(scrapers, results):
+        name = scraper.__class__.__name__
+        if isinstance(result, Exception):
+            print(f"Error running {name}: {result}")
+            statuses[name] = "failed"
             success = False
+        else:
+            print(f"Successfully ran {name}")
+            statuses[name] = "ok"
+
+    metrics.write_report(statuses)
+    if config.TRACE_PATH:
+        trace.write(statuses)
+    httpcache.evict()
+    if success:
+        write_combined_feed(skip)
+        generate_index_html()
+        if config.PRECOMPRESS:
+            publish.precompress()
+        publish.report(publish.changes(published))
+    return success
+
+def run_scrapers(jobs=None, timeout=600, only=None, skip=None):
+    """
+    Runs all enabled scrapers, then regenerates feed/index.html.
+    By default scrapers run one after another in this process; with `jobs` set,
+    each one runs in a separate worker process with a hard `timeout` in seconds.
+    """
+    enabled = enabled_scrapers(only, skip)
+    metrics.clear_partials()
+    trace.clear_partials()
+    published = publish.snapshot()
+
+    success = True
+    statuses = {}
+    if jobs:
+        print(f"Running {len(enabled)} scrapers in up to {jobs} worker processes (timeout {timeout}s each)")
+        exit_codes = run_parallel(enabled, jobs, timeout)
+        print("-" * 20)
+        for name in enabled:
+            code = exit_codes.get(name)
+            status = "ok" if code == 0 else ("timed out" if code is None else f"failed (exit code {code})")
+            print(f"{name}: {status}")
+            statuses[name] = status
+            if code != 0:
+                success = False
         print("-" * 20)
+    else:
+        for name in enabled:
+            ok = run_scraper(registry.load(name)())
+            statuses[name] = "ok" if ok else "failed"
+            if not ok:
+                success = False
+            print("-" * 20)
+
+    metrics.write_report(statuses)
+    if config.TRACE_PATH:
+        trace.write(statuses)
+    httpcache.evict()
 
     if not success:
         print("One or more scrapers failed.")
         sys.exit(1)
 
+    write_combined_feed(skip)
     generate_index_html()
+    if config.PRECOMPRESS:
+        publish.precompress()
+    publish.report(publish.changes(published))
+
+def write_combined_feed(skip=None):
+    """
+    Writes feed/all.xml from the items the scrapers saved (see scrapers/combined.py).
+    Every enabled source is merged, including those left out by --only;
+    sources that are skipped or in DISABLED_SCRAPERS are not.
+    """
+    from scrapers import combined  # imports rfeed, which the startup path does not need
+
+    combined.write(sources=registry.sources(registry.select(skip=skip)))
 
 def generate_index_html():
-    """Generates an index.html linking to all XML feeds."""
+    """Generates an index.html linking to all feeds."""
     feed_dir = "feed"
     if not os.path.exists(feed_dir):
         return
 
-    files = [f for f in os.listdir(feed_dir) if f.endswith(".xml")]
+    # Every feed format (see FEED_FORMATS); metrics.json is not a feed
+    files = [f for f in os.listdir(feed_dir)
+             if f.endswith((".xml", ".atom", ".json", ".jsonl")) and f != os.path.basename(metrics.REPORT_PATH)]
     files.sort()
 
     html_content = """
@@ -107,9 +268,86 @@ def generate_index_html():
     </html>
     """
 
-    with open(os.path.join(feed_dir, "index.html"), "w") as f:
-        f.write(html_content)
-    print("Generated feed/index.html")
+    if publish.publish(os.path.join(feed_dir, "index.html"), html_content):
+        print("Generated feed/index.html")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate RSS feeds for all configured sources.")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="Run scrapers in up to N parallel worker processes (default: sequential, in-process)")
+    parser.add_argument("--timeout", type=float, default=600,
+                        help="Hard per-scraper timeout in seconds when running with --jobs (default: 600)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run all scrapers concurrently on a single asyncio event loop")
+    parser.add_argument("--deadline", metavar="DURATION",
+                        help="Total time budget of the run, e.g. 300s or 5m. Scrapers stop fetching article pages "
+                             "shortly before it and write feeds with what they have")
+    parser.add_argument("--only", metavar="NAMES",
+                        help="Run only these scrapers (comma-separated class or module names, e.g. amazon,nvidia)")
+    parser.add_argument("--skip", metavar="NAMES",
+                        help="Do not run these scrapers (comma-separated, added to DISABLED_SCRAPERS)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Fetch every article page again instead of reusing the article store")
+    parser.add_argument("--profile", nargs="?", const="profiles", metavar="DIR",
+                        help="Profile each scraper with cProfile into DIR/<ScraperClass>.prof (default DIR: profiles)")
+    parser.add_argument("--profile-top", type=int, default=15, metavar="N",
+                        help="Number of functions in the printed profile summary (default: 15)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Write a Chrome/Perfetto trace-event JSON of the run to FILE")
+    parser.add_argument("--record", metavar="DIR",
+                        help="Record every HTTP response into the cassette directory DIR")
+    parser.add_argument("--replay", metavar="DIR",
+                        help="Serve HTTP responses from the cassette DIR on a local stand-in server instead of the network")
+    parser.add_argument("--replay-latency", default="recorded", metavar="MS",
+                        help="Latency of replayed responses in milliseconds, or 'recorded' (default)")
+    args = parser.parse_args(argv)
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.jobs is not None and args.use_async:
+        parser.error("--jobs and --async are mutually exclusive")
+    if args.profile and args.use_async:
+        parser.error("--profile needs a thread per scraper; use it without --async")
+    if args.record and args.replay:
+        parser.error("--record and --replay are mutually exclusive")
+    if args.deadline:
+        try:
+            args.deadline = deadline.parse_duration(args.deadline)
+        except ValueError as e:
+            parser.error(f"argument --deadline: {e}")
+    try:
+        registry.select(args.only, args.skip)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.replay:
+        from scrapers import cassette
+        try:
+            args.replay_latency = cassette.parse_latency(args.replay_latency)
+        except argparse.ArgumentTypeError as e:
+            parser.error(f"argument --replay-latency: {e}")
+    return args
 
 if __name__ == "__main__":
-    run_scrapers()
+    args = parse_args()
+    if args.deadline:
+        config.override("DEADLINE", time.time() + args.deadline)
+    if args.refresh:
+        config.override("REFRESH_ARTICLES", True)
+    if args.profile:
+        config.override("PROFILE_DIR", args.profile)
+        config.override("PROFILE_TOP", args.profile_top)
+    if args.trace:
+        config.override("TRACE_PATH", args.trace)
+    if args.record:
+        config.override("RECORD_DIR", args.record)
+    if args.replay:
+        from scrapers import cassette
+        server = cassette.start_server(args.replay, latency=args.replay_latency)
+        config.override("REPLAY_SERVER", cassette.server_url(server))
+        print(f"Replaying {args.replay} from {config.REPLAY_SERVER}")
+    if args.use_async:
+        from scrapers import transport  # curl_cffi is slow to import; the sync path leaves it to the workers
+        if not transport.run(arun_scrapers(args.only, args.skip)):
+            print("One or more scrapers failed.")
+            sys.exit(1)
+    else:
+        run_scrapers(jobs=args.jobs, timeout=args.timeout, only=args.only, skip=args.skip)
@@ -1,20 +1,15 @@
-import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from rfeed import *
 import datetime
-import xml.dom.minidom
-import os
 import re
 from dateutil import parser as date_parser
 
-import requests
-from bs4 import BeautifulSoup
-from rfeed import *
-import datetime
-import xml.dom.minidom
-import os
-import re
-from dateutil import parser as date_parser
+from scrapers import transport
+from scrapers.discovery import select_recent
+from scrapers.archive import first_seen
+from scrapers.feedwriter import write_feed
+from scrapers.parsing import parse_xml, parsed, with_class
+from scrapers.store import ArticleStore
 
 class AMDScraper:
     def extract_text(self, soup_element):
@@ -47,20 +42,47 @@ class AMDScraper:
         
         return text
 
+    async def fetch_description(self, entry):
+        """
+        Fetches the article page and returns its full text,
+        or None if the page can't be fetched or parsed.
+        """
+        link = entry['link']
+        try:
+            # print(f"Fetching article: {link}")
+            art_response = await transport.get(link)
+            art_response.raise_for_status()
+            
+            # Selector: article.full-news-article
+            with parsed(art_response, SoupStrainer('article', class_=with_class('full-news-article'))) as art_soup:
+                content_div = art_soup.find('article', class_='full-news-article')
+                
+                if content_div:
+                    return self.extract_text(content_div)
+            
+            print(f"Could not find content div for {link}")
+        except Exception as e:
+            print(f"Failed to fetch/parse article {link}: {e}")
+        
+        return None
+
     def generate_feed(self):
+        return transport.run(self.agenerate_feed())
+
+    async def agenerate_feed(self):
         rss_url = "https://ir.amd.com/news-events/press-releases/rss"
         try:
-            response = requests.get(rss_url, headers={'User-Agent': 'Mozilla/5.0'})
+            response = await transport.get(rss_url)
             response.raise_for_status()
-        except requests.RequestException as e:
+        except transport.RequestException as e:
             print(f"Error fetching RSS URL: {e}")
             return
     
         # Parse RSS XML
-        soup = BeautifulSoup(response.content, 'xml')
+        soup = parse_xml(response)
         items = soup.find_all('item')
         
-        feed_items = []
+        entries = []
         
         print(f"Found {len(items)} items in RSS feed. Processing...")
         
@@ -74,43 +96,40 @@ class AMDScraper:
                 pub_date = date_parser.parse(pub_date_str)
             except Exception as e:
                 print(f"Error parsing date {pub_date_str}: {e}")
-                pub_date = datetime.datetime.now()
+                pub_date = first_seen(link)
     
-            description = ""
-            
-            # Fetch full article content
-            try:
-                # print(f"Fetching article: {link}")
-                art_response = requests.get(link, headers={'User-Agent': 'Mozilla/5.0'})
-                art_response.raise_for_status()
-                art_soup = BeautifulSoup(art_response.content, 'html.parser')
-                
-                # Selector: article.full-news-article
-                content_div = art_soup.find('article', class_='full-news-article')
-                
-                if content_div:
-                    description = self.extract_text(content_div)
-                else:
-                    print(f"Could not find content div for {link}")
-                    # Fallback to RSS description
-                    rss_desc = item.find('description')
-                    if rss_desc:
-                        description = rss_desc.get_text(strip=True)
+            rss_desc = item.find('description')
+            entries.append({
+                'title': title,
+                'link': link,
+                'pubDate': pub_date,
+                'rss_description': rss_desc.get_text(strip=True) if rss_desc else ""
+            })
     
-            except Exception as e:
-                print(f"Failed to fetch/parse article {link}: {e}")
+        # Only fetch articles inside the lookback window
+        entries = select_recent(entries)
+        
+        # Fetch full article content concurrently
+        store = ArticleStore("amd")
+        descriptions = await store.fetch_all(
+            self.fetch_description, entries,
+            key=lambda entry: entry['link'],
+            fingerprint=lambda entry: [entry['title'], entry['rss_description']]
+        )
+        
+        feed_items = []
+        for entry, description in zip(entries, descriptions):
+            if description is None:
                 # Fallback to RSS description
-                rss_desc = item.find('description')
-                if rss_desc:
-                    description = rss_desc.get_text(strip=True)
-    
+                description = entry['rss_description']
+            
             feed_item = Item(
-                title=title,
-                link=link,
+                title=entry['title'],
+                link=entry['link'],
                 description=description,
                 author="AMD",
-                guid=Guid(link),
-                pubDate=pub_date
+                guid=Guid(entry['link']),
+                pubDate=entry['pubDate']
             )
             feed_items.append(feed_item)
     
@@ -126,27 +145,7 @@ class AMDScraper:
             items=feed_items
         )
         
-        rss_content = feed.rss()
-        dom = xml.dom.minidom.parseString(rss_content)
-        pretty_xml = dom.toprettyxml(indent="  ")
-        # Inject stylesheet
-        pretty_xml = pretty_xml.replace('<?xml version="1.0" ?>', '<?xml version="1.0" ?>\n<?xml-stylesheet type="text/xsl" href="style.xsl"?>')
-        
-        
-        # Post-process to add CDATA
-        def replace_cdata(match):
-            content = match.group(1)
-            # Unescape basic XML entities
-            content = content.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&').replace('&quot;', '"').replace('&apos;', "'")
-            return f"<description><![CDATA[{content}]]></description>"
-            
-        pretty_xml = re.sub(r'<description>(.*?)</description>', replace_cdata, pretty_xml, flags=re.DOTALL)
-        
-        os.makedirs("feed", exist_ok=True)
-        
-        with open("feed/amd.xml", "w") as f:
-            f.write(pretty_xml)
-        print(f"Generated feed/amd.xml with {len(feed_items)} items.")
+        write_feed(feed, "feed/amd.xml")
 
 if __name__ == "__main__":
     scraper = AMDScraper()
@@ -1,28 +1,86 @@
-import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from rfeed import *
 import datetime
-from email.utils import formatdate
 import re
-import xml.dom.minidom
-import os
+
+from scrapers import transport
+from scrapers.discovery import select_recent
+from scrapers.archive import first_seen
+from scrapers.feedwriter import write_feed
+from scrapers.parsing import parse_html, parsed
+from scrapers.store import ArticleStore
 
 class AnthropicScraper:
+    def needs_description(self, entry):
+        """Whether the listing description is missing or generic."""
+        description = entry['description']
+        is_generic = description.startswith("Anthropic is an AI safety and research company")
+        return not description or is_generic
+
+    async def fetch_description(self, entry):
+        """
+        Fetches the article page for a better description.
+        Returns None if the page can't be fetched or has none.
+        """
+        link = entry['link']
+        try:
+            print(f"Fetching description for: {link}")
+            art_response = await transport.get(link)
+            art_response.raise_for_status()
+
+            with parsed(art_response, SoupStrainer(['meta', 'main'])) as art_soup:
+                new_description = ""
+
+                # Try meta description
+                meta_desc = art_soup.find('meta', attrs={'name': 'description'})
+                if meta_desc:
+                    content = meta_desc.get('content', '')
+                    if content and not content.startswith("Anthropic is an AI safety and research company"):
+                        new_description = content
+
+                # Try og:description
+                if not new_description:
+                    og_desc = art_soup.find('meta', attrs={'property': 'og:description'})
+                    if og_desc:
+                        content = og_desc.get('content', '')
+                        if content and not content.startswith("Anthropic is an AI safety and research company"):
+                            new_description = content
+
+                # Fallback to full article content
+                if not new_description:
+                    main_content = art_soup.find('main')
+                    if main_content:
+                        paragraphs = main_content.find_all('p')
+                        if paragraphs:
+                            # Take all paragraphs and join with space for single line
+                            text_chunks = [p.get_text(strip=True) for p in paragraphs]
+                            new_description = " ".join(text_chunks)
+
+            return new_description or None
+
+        except Exception as e:
+            print(f"Failed to fetch description for {link}: {e}")
+            return None
+
     def generate_feed(self):
+        return transport.run(self.agenerate_feed())
+
+    async def agenerate_feed(self):
         url = "https://www.anthropic.com/news"
         try:
-            response = requests.get(url)
+            response = await transport.get(url)
             response.raise_for_status()
-        except requests.RequestException as e:
+        except transport.RequestException as e:
             print(f"Error fetching URL: {e}")
             return
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = parse_html(response, SoupStrainer('a', href=re.compile(r'^/news/')))
         
         # Find all news items
         # Selector: a[href^="/news/"]
         articles = soup.select('a[href^="/news/"]')
         
+        entries = []
         items = []
         seen_guids = set()
         
@@ -47,7 +105,7 @@ class AnthropicScraper:
 
             # Date
             # Look for time tag
-            pub_date = datetime.datetime.now() # Default to now
+            pub_date = None
             date_str = ""
 
             time_tag = article.find('time')
@@ -61,72 +119,51 @@ class AnthropicScraper:
                 ]
                 for fmt in formats:
                     try:
-                        pub_date = datetime.datetime.strptime(text, fmt)
+                        pub_date = datetime.datetime.strptime(text, fmt).replace(tzinfo=datetime.timezone.utc)
                         date_str = text
                         break
                     except ValueError:
                         continue
 
+            if pub_date is None:
+                # Undated items keep the date they were first seen
+                pub_date = first_seen(link)
+
             # Description
             # Find the first p tag
             description_tag = article.find('p')
             description = description_tag.get_text(strip=True) if description_tag else ""
 
-            # Check if description is missing or generic
-            is_generic = description.startswith("Anthropic is an AI safety and research company")
+            entries.append({
+                'title': title,
+                'link': link,
+                'pubDate': pub_date,
+                'description': description
+            })
 
-            if not description or is_generic:
-                try:
-                    print(f"Fetching description for: {link}")
-                    art_response = requests.get(link)
-                    art_response.raise_for_status()
-                    art_soup = BeautifulSoup(art_response.content, 'html.parser')
-
-                    new_description = ""
-
-                    # Try meta description
-                    meta_desc = art_soup.find('meta', attrs={'name': 'description'})
-                    if meta_desc:
-                        content = meta_desc.get('content', '')
-                        if content and not content.startswith("Anthropic is an AI safety and research company"):
-                            new_description = content
-
-                    # Try og:description
-                    if not new_description:
-                        og_desc = art_soup.find('meta', attrs={'property': 'og:description'})
-                        if og_desc:
-                            content = og_desc.get('content', '')
-                            if content and not content.startswith("Anthropic is an AI safety and research company"):
-                                new_description = content
-
-                    # Fallback to full article content
-                    if not new_description:
-                        main_content = art_soup.find('main')
-                        if main_content:
-                            paragraphs = main_content.find_all('p')
-                            if paragraphs:
-                                # Take all paragraphs and join with space for single line
-                                text_chunks = [p.get_text(strip=True) for p in paragraphs]
-                                new_description = " ".join(text_chunks)
-
-                    if new_description:
-                        description = new_description
-
-                except Exception as e:
-                    print(f"Failed to fetch description for {link}: {e}")
-
-            # Filter out items older than 2 months (approx 60 days)
-            cutoff_date = datetime.datetime.now() - datetime.timedelta(days=60)
-            if pub_date < cutoff_date:
-                continue
+        # Only keep articles inside the lookback window
+        entries = select_recent(entries)
+        
+        # Fetch missing or generic descriptions concurrently
+        to_fetch = [entry for entry in entries if self.needs_description(entry)]
+        store = ArticleStore("anthropic")
+        descriptions = await store.fetch_all(
+            self.fetch_description, to_fetch,
+            key=lambda entry: entry['link'],
+            fingerprint=lambda entry: [entry['title'], entry['description']]
+        )
+        for entry, description in zip(to_fetch, descriptions):
+            if description:
+                entry['description'] = description
 
+        for entry in entries:
             item = Item(
-                title=title,
-                link=link,
-                description=description,
+                title=entry['title'],
+                link=entry['link'],
+                description=entry['description'],
                 author="Anthropic",
-                guid=Guid(link),
-                pubDate=pub_date
+                guid=Guid(entry['link']),
+                pubDate=entry['pubDate']
             )
             items.append(item)
         
@@ -142,15 +179,7 @@ class AnthropicScraper:
             items=items
         )
 
-        rss_content = feed.rss()
-        dom = xml.dom.minidom.parseString(rss_content)
-        pretty_xml = dom.toprettyxml(indent="  ")
-
-        os.makedirs("feed", exist_ok=True)
-
-        with open("feed/anthropic.xml", "w") as f:
-            f.write(pretty_xml)
-        print(f"Generated feed/anthropic.xml with {len(items)} items.")
+        write_feed(feed, "feed/anthropic.xml")
 
 if __name__ == "__main__":
     scraper = AnthropicScraper()
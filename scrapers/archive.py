@@ -0,0 +1,231 @@
+"""
+Archive of every item that has been in a feed (SQLite, in CACHE_DIR/archive.sqlite3).
+
+Feeds only show the last LOOKBACK_DAYS days. The feed writer also upserts
+each item into the archive, keyed by GUID, together with a hash of its
+content. The archive keeps items after they have left the feeds. Dates are
+stored as ISO 8601 UTC text, so range queries on the (source, pub_date) index
+return any window of a source in date order. A feed for any window can be
+rebuilt from the archive without scraping again. The archive also keeps the
+near-duplicate fingerprint of each item (see scrapers.neardup), and when each
+GUID was first seen. Scrapers use that as the date of items that have none,
+so an undated item keeps the same date from run to run.
+
+
+Usage: python -m scrapers.archive rebuild SOURCE [--since DATE] [--until DATE] [--output FILE]
+       python -m scrapers.archive stats
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+
+import rfeed
+
+from scrapers import config, feedwriter, neardup
+from scrapers.httpcache import write_atomic
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    guid TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    title TEXT,
+    link TEXT,
+    pub_date TEXT,
+    description TEXT,
+    author TEXT,
+    fetched_at TEXT NOT NULL,
+    content_hash TEXT NOT NULL
+);
+-- guid is indexed as the primary key
+CREATE INDEX IF NOT EXISTS items_source_pub_date ON items (source, pub_date);
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    title TEXT,
+    link TEXT,
+    description TEXT,
+    language TEXT
+);
+-- SimHash of each item, and the content_hash of the version it was computed from
+CREATE TABLE IF NOT EXISTS fingerprints (
+    guid TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    simhash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS first_seen (
+    guid TEXT PRIMARY KEY,
+    seen_at TEXT NOT NULL
+);
+"""
+
+# Only rewrite a row when its content changed; fetched_at keeps the time it was last new.
+UPSERT = """
+INSERT INTO items (guid, source, title, link, pub_date, description, author, fetched_at, content_hash)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (guid) DO UPDATE SET
+    source = excluded.source, title = excluded.title, link = excluded.link,
+    pub_date = excluded.pub_date, description = excluded.description, author = excluded.author,
+    fetched_at = excluded.fetched_at, content_hash = excluded.content_hash
+WHERE items.content_hash != excluded.content_hash
+"""
+
+def db_path():
+    return os.path.join(config.CACHE_DIR, "archive.sqlite3")
+
+def connect():
+    os.makedirs(config.CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(db_path(), timeout=30)
+    conn.executescript(SCHEMA)
+    return conn
+
+def utc_iso(date):
+    """ISO 8601 text in UTC; sorts in date order."""
+    # Naive dates are taken as UTC, as in the feed writer
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+    return date.astimezone(datetime.timezone.utc).isoformat(timespec="seconds")
+
+def first_seen(guid):
+    """
+    When guid was first seen, as a UTC datetime: the first call's time, or for
+    an item archived before, the time it was archived. The date of undated items.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    conn = connect()
+    try:
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO first_seen (guid, seen_at) "
+                         "SELECT ?, COALESCE((SELECT fetched_at FROM items WHERE guid = ?), ?)", (guid, guid, now))
+            seen_at, = conn.execute("SELECT seen_at FROM first_seen WHERE guid = ?", (guid,)).fetchone()
+    finally:
+        conn.close()
+    return datetime.datetime.fromisoformat(seen_at)
+
+def content_hash(item):
+    """Hash of what a reader sees of an item."""
+    data = json.dumps([item.title, item.link, item.description, item.author,
+                       utc_iso(item.pubDate) if item.pubDate else None], ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def _guid(item):
+    return item.guid.guid if item.guid is not None else item.link
+
+def add_feed(source, feed):
+    """Upserts the items and channel of feed (an rfeed.Feed) under source."""
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    rows = [(_guid(item), source, item.title, item.link, utc_iso(item.pubDate) if item.pubDate else None,
+             item.description, item.author, now, content_hash(item))
+            for item in feed.items if _guid(item)]
+    conn = connect()
+    try:
+        with conn:
+            conn.executemany(UPSERT, rows)
+            conn.execute("INSERT OR REPLACE INTO sources (source, title, link, description, language) VALUES (?, ?, ?, ?, ?)",
+                         (source, feed.title, feed.link, feed.description, feed.language))
+            _add_fingerprints(conn, rows)
+    finally:
+        conn.close()
+
+def _add_fingerprints(conn, rows):
+    # Only items that are new or whose content changed are hashed
+    known = {}
+    guids = [row[0] for row in rows]
+    for start in range(0, len(guids), 500):
+        chunk = guids[start:start + 500]
+        known.update(conn.execute(f"SELECT guid, content_hash FROM fingerprints WHERE guid IN ({','.join('?' * len(chunk))})",
+                                  chunk))
+    new = [(guid, digest, neardup.fingerprint(title, description))
+           for guid, source, title, link, pub_date, description, author, now, digest in rows
+           if known.get(guid) != digest]
+    conn.executemany("INSERT OR REPLACE INTO fingerprints (guid, content_hash, simhash) VALUES (?, ?, ?)", new)
+
+def fingerprints():
+    """{GUID: hex SimHash} of every archived item."""
+    conn = connect()
+    try:
+        return dict(conn.execute("SELECT guid, simhash FROM fingerprints"))
+    finally:
+        conn.close()
+
+def items(source, since=None, until=None, conn=None):
+    """rfeed Items of source published in [since, until), newest first."""
+    query = "SELECT guid, title, link, pub_date, description, author FROM items WHERE source = ?"
+    params = [source]
+    if since:
+        query += " AND pub_date >= ?"
+        params.append(utc_iso(since))
+    if until:
+        query += " AND pub_date < ?"
+        params.append(utc_iso(until))
+    query += " ORDER BY pub_date DESC"
+
+    own = conn is None
+    conn = conn or connect()
+    try:
+        return [rfeed.Item(title=title, link=link, description=description, author=author,
+                           guid=rfeed.Guid(guid),
+                           pubDate=datetime.datetime.fromisoformat(pub_date) if pub_date else None)
+                for guid, title, link, pub_date, description, author in conn.execute(query, params)]
+    finally:
+        if own:
+            conn.close()
+
+def rebuild(source, since=None, until=None):
+    """Returns an rfeed.Feed of source for the window [since, until) from the archive."""
+    conn = connect()
+    try:
+        channel = conn.execute("SELECT title, link, description, language FROM sources WHERE source = ?",
+                               (source,)).fetchone()
+        if channel is None:
+            raise KeyError(f"No archived feed for {source!r}")
+        title, link, description, language = channel
+        return rfeed.Feed(title=title, link=link, description=description, language=language,
+                          lastBuildDate=datetime.datetime.now(datetime.timezone.utc),
+                          items=items(source, since, until, conn))
+    finally:
+        conn.close()
+
+def _date(value):
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an ISO date like 2025-01-31, not {value!r}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scrapers.archive")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser("rebuild", help="Write a feed of one source for a date window")
+    rebuild_parser.add_argument("source", help="Feed name, e.g. amazon or google")
+    rebuild_parser.add_argument("--since", type=_date, help="First publication date (inclusive)")
+    rebuild_parser.add_argument("--until", type=_date, help="Last publication date (exclusive)")
+    rebuild_parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    subparsers.add_parser("stats", help="Show the number of archived items per source")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        conn = connect()
+        rows = conn.execute("SELECT source, COUNT(*), MIN(pub_date), MAX(pub_date) FROM items GROUP BY source ORDER BY source")
+        for source, count, oldest, newest in rows:
+            print(f"{source:16s} {count:6d} items  {oldest} .. {newest}")
+        conn.close()
+        return 0
+
+    try:
+        feed = rebuild(args.source, args.since, args.until)
+    except KeyError as e:
+        print(e.args[0])
+        return 1
+    document = feedwriter.render_rss(feed)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        write_atomic(args.output, document.encode("utf-8"))
+        print(f"Wrote {len(feed.items)} items to {args.output}")
+    else:
+        sys.stdout.write(document)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Record/replay of the scrapers' HTTP traffic, for offline runs.
+
+With RECORD_DIR set (run_feeds.py --record DIR), every response a scraper
+receives is saved into that directory, the cassette. Each URL gets a JSON
+metadata file (URL, status, headers, time taken) and a body file.
+
+With REPLAY_SERVER set, requests go to a local stand-in server that serves a
+cassette instead of the network (run_feeds.py --replay DIR starts one). The
+stand-in answers conditional requests the way the origin did, and it waits
+before each response. The wait is either the recorded time or a fixed latency,
+so a replayed run has about the wall-clock behavior of the recorded one.
+URLs missing from the cassette get a 404.
+
+Usage: python -m scrapers.cassette serve DIR [--port PORT] [--latency recorded|MS]
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+
+from scrapers import config
+from scrapers.httpcache import write_atomic
+
+# Headers that describe the transfer rather than the content; bodies are stored decoded.
+_TRANSFER_HEADERS = {"connection", "content-encoding", "content-length", "keep-alive", "transfer-encoding"}
+
+def _paths(directory, url):
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    base = os.path.join(directory, key)
+    return base + ".json", base + ".body"
+
+def record(url, response, elapsed):
+    """Saves a response into the RECORD_DIR cassette. Failures never break a fetch."""
+    meta = {
+        "url": url,
+        "status": response.status_code,
+        "headers": {name.lower(): value for name, value in response.headers.items()
+                    if name.lower() not in _TRANSFER_HEADERS},
+        "elapsed": round(elapsed, 4),
+    }
+    meta_path, body_path = _paths(config.RECORD_DIR, url)
+    try:
+        os.makedirs(config.RECORD_DIR, exist_ok=True)
+        write_atomic(body_path, response.content)
+        write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+    except OSError as e:
+        print(f"Could not record {url}: {e}")
+
+def load(directory, url):
+    """Returns (metadata, body) of the recorded response for url, or None."""
+    meta_path, body_path = _paths(directory, url)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            body = f.read()
+    except (OSError, ValueError):
+        return None
+    return meta, body
+
+def recorded_urls(directory):
+    """The URLs recorded in a cassette."""
+    urls = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".json"):
+            with open(entry.path, "r", encoding="utf-8") as f:
+                urls.append(json.load(f)["url"])
+    return urls
+
+def replay_url(url):
+    """Where a request for url is sent when replaying."""
+    return f"{config.REPLAY_SERVER}/{quote(url, safe='')}"
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves recorded responses; the request path is the quoted original URL."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def respond(self, send_body):
+        url = unquote(self.path[1:])
+        recorded = load(self.server.directory, url)
+        if recorded is None:
+            status, headers, body, elapsed = 404, {"content-type": "text/plain"}, b"Not in cassette", 0
+        else:
+            meta, body = recorded
+            status, headers, elapsed = meta["status"], meta["headers"], meta.get("elapsed", 0)
+            if status == 200 and self.not_modified(headers):
+                status, body = 304, b""
+
+        latency = elapsed if self.server.latency is None else self.server.latency
+        if latency:
+            time.sleep(latency)
+
+        self.send_response(status)
+        for name, value in headers.items():
+            # send_response() already adds its own
+            if name not in ("date", "server"):
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def not_modified(self, headers):
+        etag = self.headers.get("If-None-Match")
+        if etag and etag == headers.get("etag"):
+            return True
+        since = self.headers.get("If-Modified-Since")
+        return bool(since) and since == headers.get("last-modified")
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(directory, latency=None, port=0):
+    """
+    Starts a stand-in server for a cassette on a background thread and returns it.
+    latency is the wait before each response in seconds, or None for the recorded time.
+    """
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"Cassette directory {directory} does not exist")
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandInHandler)
+    server.daemon_threads = True
+    server.directory = directory
+    server.latency = latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def server_url(server):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+def parse_latency(value):
+    """'recorded' -> None, otherwise milliseconds -> seconds."""
+    if value == "recorded":
+        return None
+    try:
+        return float(value) / 1000
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"latency must be 'recorded' or milliseconds, not {value!r}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m scrapers.cassette")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve = subparsers.add_parser("serve", help="Serve a cassette on a local stand-in server")
+    serve.add_argument("directory")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency", type=parse_latency, default=None,
+                       help="'recorded' (default) or a fixed latency in milliseconds")
+    args = parser.parse_args()
+
+    server = start_server(args.directory, latency=args.latency, port=args.port)
+    print(f"Serving {len(recorded_urls(args.directory))} recorded responses at {server_url(server)}")
+    print(f"Run the scrapers with REPLAY_SERVER={server_url(server)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
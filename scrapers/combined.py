@@ -0,0 +1,133 @@
+"""
+Combined feed of every source (feed/all.xml).
+
+When a scraper writes its feed, the feed writer also saves the items newest
+first, one JSON object per line, to CACHE_DIR/combined/<source>.jsonl. After
+the scrapers have run, write() merges these already sorted streams with
+heapq.merge. It reads one line per source at a time, drops GUIDs it has
+already seen and stops after ALL_FEED_MAX_ITEMS items. Nothing is fetched
+again and no XML is parsed. Near-duplicates from different sources, found by
+their archived fingerprints, are collapsed into the newest of them, which
+links to the others (see scrapers.neardup).
+
+A source keeps its last saved items until its scraper runs again, so runs
+with --only still produce a complete combined feed. Only the sources that are
+enabled (not disabled or skipped) are merged, and items older than the
+LOOKBACK_DAYS window are dropped, so old items leave the combined feed even
+when their source stops running. Workers started with --jobs save their own
+files, which the parent merges.
+"""
+import datetime
+import heapq
+import html
+import itertools
+import json
+import os
+
+import rfeed
+
+from scrapers import archive, config, discovery, feedwriter, neardup
+from scrapers.httpcache import write_atomic
+
+ALL_PATH = os.path.join("feed", "all.xml")
+
+def _dir():
+    return os.path.join(config.CACHE_DIR, "combined")
+
+def save(source, feed):
+    """Saves the items of source's feed, newest first, for the combined feed."""
+    entries = [{
+        "guid": item.guid.guid if item.guid is not None else item.link,
+        "title": item.title,
+        "link": item.link,
+        "description": item.description,
+        "author": item.author,
+        "pubDate": archive.utc_iso(item.pubDate) if item.pubDate else "",
+    } for item in feed.items]
+    # Undated items go last
+    entries.sort(key=lambda entry: entry["pubDate"], reverse=True)
+
+    header = {"source": source, "title": feed.title, "link": feed.link}
+    lines = [json.dumps(header, ensure_ascii=False)] + [json.dumps(entry, ensure_ascii=False) for entry in entries]
+    os.makedirs(_dir(), exist_ok=True)
+    write_atomic(os.path.join(_dir(), f"{source}.jsonl"), ("\n".join(lines) + "\n").encode("utf-8"))
+
+def _stream(path, cutoff):
+    """
+    Yields the entries of one saved source published at or after cutoff (ISO
+    text), newest first, each with its source's header.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        for line in f:
+            entry = json.loads(line)
+            # Undated entries sort last and are kept
+            if entry["pubDate"] and entry["pubDate"] < cutoff:
+                continue
+            entry["source"] = header
+            yield entry
+
+def _unique(entries):
+    seen = set()
+    for entry in entries:
+        if entry["guid"] not in seen:
+            seen.add(entry["guid"])
+            yield entry
+
+def merged(limit=None, fingerprints=None, sources=None):
+    """
+    Entries of the saved sources (default every one) inside the lookback
+    window, newest first, without duplicate GUIDs, at most limit of them. With
+    fingerprints ({GUID: hex SimHash}), near-duplicates are collapsed as well.
+    """
+    if not os.path.isdir(_dir()):
+        return iter(())
+    paths = sorted(entry.path for entry in os.scandir(_dir())
+                   if entry.name.endswith(".jsonl") and (sources is None or entry.name[:-len(".jsonl")] in sources))
+    cutoff = archive.utc_iso(discovery.cutoff_date())
+    entries = _unique(heapq.merge(*(_stream(path, cutoff) for path in paths),
+                                  key=lambda entry: entry["pubDate"], reverse=True))
+    if fingerprints:
+        entries = neardup.collapse(entries, fingerprints)
+    return itertools.islice(entries, limit)
+
+def _also(duplicates):
+    links = ", ".join(f'<a href="{html.escape(entry["link"] or "")}">{html.escape(entry["source"]["title"] or "")}</a>'
+                      for entry in duplicates)
+    return f"<p>Also covered by: {links}</p>"
+
+def _item(entry):
+    source = entry["source"]
+    feed_url = f"{config.SITE_URL}{source['source']}.xml"
+    description = entry["description"]
+    if entry.get("duplicates"):
+        description = (description or "") + _also(entry["duplicates"])
+    return rfeed.Item(
+        title=entry["title"],
+        link=entry["link"],
+        description=description,
+        author=entry["author"],
+        guid=rfeed.Guid(entry["guid"]),
+        pubDate=datetime.datetime.fromisoformat(entry["pubDate"]) if entry["pubDate"] else None,
+        source=rfeed.Source(source["title"], feed_url),
+    )
+
+def write(path=ALL_PATH, sources=None):
+    """Writes the combined feed of the newest ALL_FEED_MAX_ITEMS items of the given sources (default all)."""
+    entries = list(merged(config.ALL_FEED_MAX_ITEMS, archive.fingerprints(), sources))
+    collapsed = sum(len(entry.get("duplicates", ())) for entry in entries)
+    if collapsed:
+        print(f"Collapsed {collapsed} near-duplicate items into the items they repeat")
+    items = [_item(entry) for entry in entries]
+    feed = rfeed.Feed(
+        title="All AI News",
+        link=config.SITE_URL or "index.html",
+        description="Latest posts from every AI blog in RSS Miner",
+        language="en-US",
+        lastBuildDate=datetime.datetime.now(datetime.timezone.utc),
+        items=items,
+    )
+    if feedwriter.publish_feed(feed, path):
+        print(f"Generated {path} with {len(items)} items.")
+    else:
+        print(f"{path} is unchanged")
@@ -0,0 +1,22 @@
+import asyncio
+
+from scrapers import config, deadline, metrics
+
+async def fetch_all(fetch, items, limit=None):
+    """
+    Awaits fetch(item) for every item, with at most `limit` calls in flight.
+    Results are returned in the same order as the input items.
+    fetch is expected to handle its own errors and return a fallback value.
+    Items not started before the run deadline gets close get None, like a
+    failed fetch.
+    """
+    semaphore = asyncio.Semaphore(limit or config.FETCH_CONCURRENCY)
+
+    async def bounded(item):
+        async with semaphore:
+            if deadline.near():
+                metrics.add("deadline_skips")
+                return None
+            return await fetch(item)
+
+    return await asyncio.gather(*(bounded(item) for item in items))
@@ -0,0 +1,109 @@
+"""
+Run-wide settings shared by the scrapers.
+
+Every value can be overridden with an environment variable of the same name,
+so settings also reach the worker processes started by run_feeds.py.
+"""
+import os
+
+def _int(name, default):
+    value = os.environ.get(name, "").strip()
+    return int(value) if value else default
+
+def _float(name, default):
+    value = os.environ.get(name, "").strip()
+    return float(value) if value else default
+
+# Maximum number of article pages fetched at the same time by one scraper.
+FETCH_CONCURRENCY = _int("FETCH_CONCURRENCY", 8)
+
+# Only articles published within this many days are fetched and put in the feeds.
+LOOKBACK_DAYS = _int("LOOKBACK_DAYS", 60)
+
+# Directory for state kept between runs (HTTP cache and friends).
+# CI restores it with actions/cache so it survives across daily builds.
+CACHE_DIR = os.environ.get("CACHE_DIR", ".cache")
+
+# Size limit of the on-disk HTTP cache; least recently used entries are evicted
+# beyond it. 0 disables the cache.
+HTTP_CACHE_MAX_MB = _int("HTTP_CACHE_MAX_MB", 256)
+
+# Ignore the article store and fetch every article page again.
+REFRESH_ARTICLES = os.environ.get("REFRESH_ARTICLES", "") not in ("", "0")
+
+# HTTP transport policy shared by every scraper (seconds / connections per host).
+CONNECT_TIMEOUT = _int("CONNECT_TIMEOUT", 10)
+READ_TIMEOUT = _int("READ_TIMEOUT", 30)
+HOST_MAX_CONNECTIONS = _int("HOST_MAX_CONNECTIONS", 6)
+
+# Retries of connection errors, timeouts, 429 and 5xx answers, with jittered
+# exponential backoff (seconds), and the per-host circuit breaker: after
+# BREAKER_THRESHOLD failed requests in a row a host is left alone for BREAKER_COOLDOWN
+# seconds. See scrapers/fetchpolicy.py.
+FETCH_RETRIES = _int("FETCH_RETRIES", 3)
+RETRY_BASE_DELAY = _float("RETRY_BASE_DELAY", 1.0)
+RETRY_MAX_DELAY = _float("RETRY_MAX_DELAY", 30.0)
+BREAKER_THRESHOLD = _int("BREAKER_THRESHOLD", 5)
+BREAKER_COOLDOWN = _int("BREAKER_COOLDOWN", 120)
+
+# Fetch scheduler (see scrapers/scheduler.py): requests per second and burst size
+# per host, requests in flight per host and in total. A Crawl-delay in a host's
+# robots.txt lowers its rate further.
+HOST_RATE = _float("HOST_RATE", 4.0)
+HOST_BURST = _int("HOST_BURST", 4)
+HOST_CONCURRENCY = _int("HOST_CONCURRENCY", 4)
+MAX_CONCURRENCY = _int("MAX_CONCURRENCY", 16)
+
+# Wall-clock time (Unix seconds) by which the run should be done, 0 for none
+# (run_feeds.py --deadline). Article fetches stop DEADLINE_MARGIN seconds before
+# it, leaving time to write the feeds. See scrapers/deadline.py.
+DEADLINE = _float("DEADLINE", 0.0)
+DEADLINE_MARGIN = _int("DEADLINE_MARGIN", 20)
+
+# Public base URL of the published feed/ directory, ending in "/". Used for
+# links in the combined feed (feed/all.xml), which keeps the newest
+# ALL_FEED_MAX_ITEMS items of all sources.
+SITE_URL = os.environ.get("SITE_URL", "")
+ALL_FEED_MAX_ITEMS = _int("ALL_FEED_MAX_ITEMS", 100)
+
+# Formats written for every feed, comma-separated: rss (feed/<source>.xml),
+# atom (.atom), json (JSON Feed 1.1, .json) and jsonl (one item per line, .jsonl).
+FEED_FORMATS = os.environ.get("FEED_FORMATS", "rss")
+
+# Budgets of feed/<source>.xml; feed/<source>-full.xml has the full text (see scrapers/summary.py).
+# Bytes per item description and sentences per item (0 = no limit).
+SUMMARY_MAX_BYTES = _int("SUMMARY_MAX_BYTES", 1000)
+SUMMARY_SENTENCES = _int("SUMMARY_SENTENCES", 0)
+# Bytes of all item descriptions of a summary feed (0 = no limit).
+FEED_MAX_BYTES = _int("FEED_MAX_BYTES", 0)
+
+# Articles from different sources whose SimHash fingerprints differ in at most this
+# many of 64 bits are shown once in feed/all.xml (see scrapers/neardup.py); -1 = off.
+NEAR_DUP_DISTANCE = _int("NEAR_DUP_DISTANCE", 8)
+
+# Write .gz/.br copies of the published files next to them (see scrapers/publish.py).
+PRECOMPRESS = os.environ.get("PRECOMPRESS", "1") not in ("", "0")
+
+# Record every response into this cassette directory (see scrapers/cassette.py).
+RECORD_DIR = os.environ.get("RECORD_DIR", "")
+
+# Base URL of a cassette stand-in server; when set, requests are replayed from it
+# instead of going to the network.
+REPLAY_SERVER = os.environ.get("REPLAY_SERVER", "")
+
+# Write a cProfile file per scraper into this directory (run_feeds.py --profile),
+# and print the PROFILE_TOP functions with the most own time.
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "")
+PROFILE_TOP = _int("PROFILE_TOP", 15)
+
+# Write a Chrome/Perfetto trace of the run to this file (run_feeds.py --trace).
+TRACE_PATH = os.environ.get("TRACE_PATH", "")
+
+# Overrides the User-Agent of the impersonated browser. Leave unset so the
+# User-Agent matches the TLS fingerprint, which Cloudflare checks.
+USER_AGENT = os.environ.get("USER_AGENT", "")
+
+def override(name, value):
+    """Sets a setting for this process and for worker processes started after the call."""
+    os.environ[name] = "1" if value is True else ("0" if value is False else str(value))
+    globals()[name] = value
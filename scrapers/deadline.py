@@ -0,0 +1,34 @@
+"""
+Run-wide deadline (run_feeds.py --deadline 300s).
+
+DEADLINE is a wall-clock timestamp, so worker processes see the same one.
+Once fewer than DEADLINE_MARGIN seconds are left, scrapers stop starting
+article-page fetches: the remaining items keep their listing or RSS
+description, and undated listings stop where they are. Requests are not
+retried past that point either. Each scraper still writes a valid feed with
+what it has.
+"""
+import re
+import time
+
+from scrapers import config
+
+def remaining():
+    """Seconds left until the deadline, or None without one."""
+    if not config.DEADLINE:
+        return None
+    return config.DEADLINE - time.time()
+
+def near(seconds=0):
+    """True once starting work that takes `seconds` would eat into the margin before the deadline."""
+    left = remaining()
+    return left is not None and left - seconds < config.DEADLINE_MARGIN
+
+_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600}
+
+def parse_duration(value):
+    """'300', '300s', '5m' or '1.5h' -> seconds."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*", value.lower())
+    if not match:
+        raise ValueError(f"expected a duration like 300s, 5m or 1h, not {value!r}")
+    return float(match.group(1)) * _UNITS[match.group(2)]
@@ -0,0 +1,71 @@
+"""
+Lookback window and fetch budgets shared by the scrapers.
+
+Article pages are the expensive part of a run, so scrapers prune what they
+discovered before fetching any of them. Listings and RSS feeds that carry dates
+go through select_recent(). Listings without dates are assumed to be in
+newest-first order and go through fetch_newest(), which stops fetching once it
+has walked past the lookback window.
+"""
+from datetime import datetime, timedelta, timezone
+
+from scrapers import config, deadline, metrics
+
+def cutoff_date():
+    """Oldest publication date that still goes into a feed."""
+    return datetime.now(timezone.utc) - timedelta(days=config.LOOKBACK_DAYS)
+
+def _utc(pub_date):
+    # Naive dates are taken as UTC, as in the feed writer
+    return pub_date if pub_date.tzinfo else pub_date.replace(tzinfo=timezone.utc)
+
+def is_recent(pub_date):
+    """True if pub_date is inside the lookback window. Counts the misses as filtered."""
+    if _utc(pub_date) >= cutoff_date():
+        return True
+    metrics.add("items_filtered")
+    return False
+
+def select_recent(entries, budget=None, date=lambda entry: entry['pubDate']):
+    """
+    Returns the entries whose date(entry) is inside the lookback window, newest
+    first. With a budget, only the newest `budget` entries are returned.
+    """
+    metrics.add("items_discovered", len(entries))
+    recent = sorted((entry for entry in entries if is_recent(date(entry))),
+                    key=lambda entry: _utc(date(entry)), reverse=True)
+    if budget:
+        recent = recent[:budget]
+    print(f"Selected {len(recent)} of {len(entries)} entries (last {config.LOOKBACK_DAYS} days"
+          + (f", newest {budget}" if budget else "") + ")")
+    return recent
+
+async def fetch_newest(fetch_all, entries, date, budget=None):
+    """
+    Fetches the details of undated listing entries in batches, in listing order,
+    until a batch ends with an article older than the lookback window, the
+    budget is used up or the run deadline gets close. fetch_all(batch) returns the details for a batch and
+    date(details) their publication date (None if unknown).
+    Returns the details of the fetched entries, in order; zip() them with entries.
+    """
+    entries = list(entries)
+    metrics.add("items_discovered", len(entries))
+    if budget:
+        entries = entries[:budget]
+    batch_size = config.FETCH_CONCURRENCY
+    results = []
+    for start in range(0, len(entries), batch_size):
+        if deadline.near():
+            # Undated entries we cannot fetch have no date to filter on; leave them out
+            print(f"Stopped after {len(results)} of {len(entries)} entries at the run deadline")
+            metrics.add("deadline_skips", len(entries) - len(results))
+            return results
+        batch = await fetch_all(entries[start:start + batch_size])
+        results.extend(batch)
+        dates = [date(details) for details in batch if details is not None]
+        dates = [pub_date for pub_date in dates if pub_date is not None]
+        if dates and _utc(dates[-1]) < cutoff_date():
+            break
+    if len(results) < len(entries):
+        print(f"Stopped after {len(results)} of {len(entries)} entries at the {config.LOOKBACK_DAYS}-day cutoff")
+    return results
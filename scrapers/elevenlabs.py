@@ -1,9 +1,21 @@
-import cloudscraper
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 import rfeed
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 import re
-import xml.dom.minidom
+
+from scrapers import transport
+from scrapers.discovery import fetch_newest, is_recent
+from scrapers.archive import first_seen
+from scrapers.feedwriter import write_feed
+from scrapers.parsing import AnyOf, parse_html, parsed, with_class
+from scrapers.store import ArticleStore
+
+# Article pages: the publication date and the article body
+ARTICLE_STRAINER = AnyOf(
+    SoupStrainer('time'),
+    SoupStrainer('div', class_=with_class('rich-text-blog')),
+    SoupStrainer('article')
+)
 
 def clean_text(text):
     """
@@ -18,33 +30,16 @@ def clean_text(text):
     text = re.sub(r'\s+', ' ', text)
     return text.strip()
 
-def replace_cdata(xml_string):
-    """
-    Post-processing to correctly wrap descriptions in CDATA.
-    Unescapes HTML entities inside the description and wraps in CDATA.
-    """
-    # Pattern to find <description> content
-    pattern = r'<description>(.*?)</description>'
-    
-    def replacer(match):
-        content = match.group(1)
-        # Unescape common HTML entities that might have been escaped by minidom
-        content = content.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&').replace('&quot;', '"').replace('&apos;', "'")
-        return f'<description><![CDATA[{content}]]></description>'
-    
-    return re.sub(pattern, replacer, xml_string, flags=re.DOTALL)
-
 class ElevenLabsScraper:
     def __init__(self):
         self.url = "https://elevenlabs.io/blog"
-        self.scraper = cloudscraper.create_scraper()
 
-    def fetch_articles(self):
+    async def fetch_articles(self):
         print(f"Fetching {self.url}...")
         try:
-            response = self.scraper.get(self.url)
+            response = await transport.get(self.url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parse_html(response, SoupStrainer('a', href=True))
             
             articles = []
             links = soup.find_all('a', href=True)
@@ -91,79 +86,94 @@ class ElevenLabsScraper:
             print(f"Error fetching articles: {e}")
             return []
 
-    def fetch_article_details(self, url):
+    async def fetch_article_details(self, url):
         """
         Fetches content and date from the article page.
-        Returns (content, pubDate)
+        Returns (content, pubDate), or None if the page can't be fetched.
         """
         print(f"Fetching details for: {url}")
         try:
-            response = self.scraper.get(url)
+            response = await transport.get(url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
             
-            # Date Extraction
-            pub_date = None
-            time_tag = soup.find('time')
-            if time_tag and time_tag.has_attr('datetime'):
-                try:
-                    # ISO format: 2025-11-26T12:43:29.862Z
-                    dt_str = time_tag['datetime'].replace('Z', '+00:00')
-                    pub_date = datetime.fromisoformat(dt_str)
-                except ValueError:
-                    pass
+            with parsed(response, ARTICLE_STRAINER) as soup:
+                # Date Extraction
+                pub_date = None
+                time_tag = soup.find('time')
+                if time_tag and time_tag.has_attr('datetime'):
+                    try:
+                        # ISO format: 2025-11-26T12:43:29.862Z
+                        dt_str = time_tag['datetime'].replace('Z', '+00:00')
+                        pub_date = datetime.fromisoformat(dt_str)
+                    except ValueError:
+                        pass
             
-            if not pub_date:
-                 # Fallback to text parsing if datetime attribute fails
-                 if time_tag:
-                     try:
-                         dt = datetime.strptime(time_tag.get_text(strip=True), "%b %d, %Y")
-                         pub_date = dt.replace(tzinfo=timezone.utc)
-                     except ValueError:
-                         pass
+                if not pub_date:
+                     # Fallback to text parsing if datetime attribute fails
+                     if time_tag:
+                         try:
+                             dt = datetime.strptime(time_tag.get_text(strip=True), "%b %d, %Y")
+                             pub_date = dt.replace(tzinfo=timezone.utc)
+                         except ValueError:
+                             pass
 
-            # Content Extraction
-            content_div = soup.find('div', class_='rich-text-blog')
-            if not content_div:
-                content_div = soup.find('article')
+                # Content Extraction
+                content_div = soup.find('div', class_='rich-text-blog')
+                if not content_div:
+                    content_div = soup.find('article')
             
-            content = ""
-            if content_div:
-                content_parts = []
-                for element in content_div.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol']):
-                    if element.name in ['ul', 'ol']:
-                        items = [clean_text(li.get_text(strip=True)) for li in element.find_all('li')]
-                        if items:
-                            content_parts.append(" ".join(items))
-                    else:
-                        text = clean_text(element.get_text(strip=True))
-                        if text:
-                            content_parts.append(text)
-                content = " ".join(content_parts)
+                content = ""
+                if content_div:
+                    content_parts = []
+                    for element in content_div.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol']):
+                        if element.name in ['ul', 'ol']:
+                            items = [clean_text(li.get_text(strip=True)) for li in element.find_all('li')]
+                            if items:
+                                content_parts.append(" ".join(items))
+                        else:
+                            text = clean_text(element.get_text(strip=True))
+                            if text:
+                                content_parts.append(text)
+                    content = " ".join(content_parts)
             
             return content, pub_date
 
         except Exception as e:
             print(f"Error fetching article details: {e}")
-            return "", None
+            return None
 
     def generate_feed(self):
-        articles = self.fetch_articles()
+        return transport.run(self.agenerate_feed())
+
+    async def agenerate_feed(self):
+        articles = await self.fetch_articles()
         
         valid_items = []
-        cutoff_date = datetime.now(timezone.utc) - timedelta(days=60)
         
-        for article in articles:
-            content, pub_date = self.fetch_article_details(article['link'])
+        # Fetch article pages concurrently. The blog lists posts newest first
+        # without dates, so fetching stops once the pages get older than the
+        # lookback window.
+        store = ArticleStore("elevenlabs")
+        details = await fetch_newest(
+            lambda batch: store.fetch_all(
+                lambda article: self.fetch_article_details(article['link']), batch,
+                key=lambda article: article['link'],
+                fingerprint=lambda article: [article['title']]
+            ),
+            articles, date=lambda article_details: article_details[1]
+        )
+        
+        for article, article_details in zip(articles, details):
+            content, pub_date = article_details if article_details is not None else ("", None)
             
             if pub_date:
                 article['pubDate'] = pub_date
             else:
-                # If no date found, default to now (or skip? let's default to now to be safe, but maybe log it)
-                print(f"Warning: No date found for {article['link']}, using current time.")
-                article['pubDate'] = datetime.now(timezone.utc)
+                # If no date found, use the time the article was first seen
+                print(f"Warning: No date found for {article['link']}, using the time it was first seen.")
+                article['pubDate'] = first_seen(article['link'])
             
-            if article['pubDate'] >= cutoff_date:
+            if is_recent(article['pubDate']):
                 item = rfeed.Item(
                     title=article['title'],
                     link=article['link'],
@@ -189,20 +199,7 @@ class ElevenLabsScraper:
             items=valid_items
         )
         
-        xml_output = feed.rss()
-        
-        dom = xml.dom.minidom.parseString(xml_output)
-        pretty_xml = dom.toprettyxml(indent="  ")
-        
-        # Inject stylesheet
-        pretty_xml = pretty_xml.replace('<?xml version="1.0" ?>', '<?xml version="1.0" ?>\n<?xml-stylesheet type="text/xsl" href="style.xsl"?>')
-        
-        final_xml = replace_cdata(pretty_xml)
-        
-        with open("feed/elevenlabs.xml", "w", encoding='utf-8') as f:
-            f.write(final_xml)
-            
-        print("Generated feed/elevenlabs.xml")
+        write_feed(feed, "feed/elevenlabs.xml")
 
 if __name__ == "__main__":
     scraper = ElevenLabsScraper()
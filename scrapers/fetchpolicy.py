@@ -0,0 +1,125 @@
+"""
+Retry and circuit-breaker policy of the transport.
+
+A request that fails with a connection error, a timeout, 429 or a 5xx answer
+is retried up to FETCH_RETRIES times. Between attempts the transport waits a
+jittered exponential backoff ("full jitter": a random time up to
+RETRY_BASE_DELAY * 2**attempt, at most RETRY_MAX_DELAY). A Retry-After header
+is honored instead, unless it asks for more than RETRY_MAX_DELAY, in which
+case the request is not retried.
+
+Each host has a circuit breaker. A request counts as one failure once its
+retries are used up, or when the answer is a Cloudflare challenge (which is
+not retried). After BREAKER_THRESHOLD failed requests in a row the breaker
+opens: requests to that host fail at once with CircuitOpenError for
+BREAKER_COOLDOWN seconds, and the scrapers fall back to the listing or RSS
+description. After the cooldown one request is let through. If it succeeds
+the breaker closes; if not it opens again.
+"""
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from curl_cffi.requests.exceptions import RequestException
+
+from scrapers import config
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(RequestException):
+    """Raised instead of sending a request to a host whose breaker is open."""
+
+class Breaker:
+    """Circuit breaker of one host."""
+
+    def __init__(self):
+        self.failures = 0
+        self.open_until = 0.0
+
+    def allow(self, now):
+        if not self.open_until:
+            return True
+        if now < self.open_until:
+            return False
+        self.open_until = now + config.BREAKER_COOLDOWN  # let one trial request through
+        return True
+
+    def success(self):
+        self.failures = 0
+        self.open_until = 0.0
+
+    def failure(self, now):
+        """Counts a failed request. Returns True if this opened the breaker."""
+        self.failures += 1
+        if self.failures < config.BREAKER_THRESHOLD:
+            return False
+        was_open = self.open_until > 0
+        self.open_until = now + config.BREAKER_COOLDOWN
+        return not was_open
+
+_breakers = {}  # host -> Breaker, for the whole process
+
+def _host(url):
+    return urlsplit(url).netloc.lower()
+
+def breaker(url):
+    return _breakers.setdefault(_host(url), Breaker())
+
+def check(url):
+    """Raises CircuitOpenError if requests to url's host are currently refused."""
+    if not breaker(url).allow(time.monotonic()):
+        raise CircuitOpenError(f"Circuit open for {_host(url)} after {breaker(url).failures} failures; not fetching {url}")
+
+def succeeded(url):
+    breaker(url).success()
+
+def failed(url, reason):
+    if breaker(url).failure(time.monotonic()):
+        print(f"{_host(url)}: {config.BREAKER_THRESHOLD} failures in a row ({reason}), "
+              f"pausing requests for {config.BREAKER_COOLDOWN}s")
+
+def is_retryable(response):
+    return response.status_code in RETRY_STATUSES
+
+def is_challenge(response):
+    """True if the response is a Cloudflare bot challenge instead of the page."""
+    if response.status_code not in (403, 503):
+        return False
+    if (response.headers.get("cf-mitigated") or "").lower() == "challenge":
+        return True
+    return b"<title>Just a moment...</title>" in response.content or b"/cdn-cgi/challenge-platform/" in response.content
+
+def is_failure(response):
+    """True if a final response counts against the host's breaker."""
+    return is_retryable(response) or is_challenge(response)
+
+def backoff(attempt):
+    """Full-jitter exponential backoff before retry number attempt + 1."""
+    return random.uniform(0, min(config.RETRY_MAX_DELAY, config.RETRY_BASE_DELAY * 2 ** attempt))
+
+def retry_after(response):
+    """Seconds asked for by a Retry-After header (delay or HTTP date), or None."""
+    value = (response.headers.get("retry-after") or "").strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+def retry_delay(response, attempt):
+    """
+    Seconds to wait before retrying after a retryable response, or None if
+    the server asks for longer than RETRY_MAX_DELAY.
+    """
+    asked = retry_after(response)
+    if asked is None:
+        return backoff(attempt)
+    return asked if asked <= config.RETRY_MAX_DELAY else None
@@ -0,0 +1,153 @@
+"""
+On-disk HTTP cache shared by all scrapers.
+
+Responses that carry an ETag or Last-Modified header are stored under
+CACHE_DIR/http, one body file plus one JSON metadata file per URL. Later
+requests for the same URL are sent with If-None-Match / If-Modified-Since and a
+304 answer is served from the stored body. Files are written atomically, so
+several worker processes can share the directory. Every hit touches the
+entry, and the least recently used entries are evicted once the cache grows
+beyond HTTP_CACHE_MAX_MB.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+from scrapers import config
+
+def enabled():
+    return config.HTTP_CACHE_MAX_MB > 0
+
+def cache_dir():
+    return os.path.join(config.CACHE_DIR, "http")
+
+def _paths(url):
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    base = os.path.join(cache_dir(), key)
+    return base + ".json", base + ".body"
+
+def write_atomic(path, data, mode=None):
+    # mkstemp creates the file with mode 0600; pass mode for files others must read
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+class CachedResponse:
+    """A stored response, mimicking the parts of the curl_cffi response the scrapers use."""
+
+    from_cache = True
+
+    def __init__(self, url, meta, content):
+        self.url = url
+        self.status_code = meta.get("status", 200)
+        self.headers = meta.get("headers", {})
+        self.content = content
+
+    @property
+    def text(self):
+        match = re.search(r"charset=([\w-]+)", self.headers.get("content-type", ""), re.I)
+        encoding = match.group(1) if match else "utf-8"
+        try:
+            return self.content.decode(encoding, errors="replace")
+        except LookupError:
+            return self.content.decode("utf-8", errors="replace")
+
+    def raise_for_status(self):
+        pass
+
+def lookup(url):
+    """Returns (metadata, body) of the cached entry for url, or None."""
+    if not enabled():
+        return None
+    meta_path, body_path = _paths(url)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            body = f.read()
+    except (OSError, ValueError):
+        return None
+    return meta, body
+
+def conditional_headers(meta):
+    """Validator headers to send for a cached entry."""
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+def hit(url, meta, body):
+    """Marks the entry as recently used and returns it as a response."""
+    meta_path, body_path = _paths(url)
+    try:
+        os.utime(meta_path)
+        os.utime(body_path)
+    except OSError:
+        pass
+    return CachedResponse(url, meta, body)
+
+def store(url, response):
+    """Stores a 200 response if it has validators. Cache failures never break a fetch."""
+    if not enabled() or response.status_code != 200:
+        return
+    etag = response.headers.get("etag")
+    last_modified = response.headers.get("last-modified")
+    if not etag and not last_modified:
+        return
+
+    meta = {
+        "url": url,
+        "status": response.status_code,
+        "etag": etag,
+        "last_modified": last_modified,
+        "headers": {"content-type": response.headers.get("content-type", "")},
+    }
+    meta_path, body_path = _paths(url)
+    try:
+        os.makedirs(cache_dir(), exist_ok=True)
+        write_atomic(body_path, response.content)
+        write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+    except OSError as e:
+        print(f"Could not write HTTP cache entry for {url}: {e}")
+
+def evict():
+    """Deletes least recently used entries until the cache fits HTTP_CACHE_MAX_MB."""
+    if not enabled() or not os.path.isdir(cache_dir()):
+        return
+
+    entries = {}  # key -> [size, last used]
+    for entry in os.scandir(cache_dir()):
+        key, ext = os.path.splitext(entry.name)
+        if ext not in (".json", ".body"):
+            continue
+        stat = entry.stat()
+        size_and_mtime = entries.setdefault(key, [0, 0])
+        size_and_mtime[0] += stat.st_size
+        size_and_mtime[1] = max(size_and_mtime[1], stat.st_mtime)
+
+    limit = config.HTTP_CACHE_MAX_MB * 1024 * 1024
+    total = sum(size for size, _ in entries.values())
+    evicted = 0
+    for key, (size, _) in sorted(entries.items(), key=lambda kv: kv[1][1]):
+        if total <= limit:
+            break
+        for ext in (".json", ".body"):
+            try:
+                os.remove(os.path.join(cache_dir(), key + ext))
+            except FileNotFoundError:
+                pass
+        total -= size
+        evicted += 1
+    if evicted:
+        print(f"Evicted {evicted} entries from the HTTP cache")
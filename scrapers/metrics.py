@@ -0,0 +1,184 @@
+"""
+Per-run metrics, written to feed/metrics.json by run_feeds.py.
+
+run_feeds.py opens a collector for each scraper with collecting(). The collector
+is held in a context variable, so scrapers sharing one event loop (--async)
+each get their own. The transport, the parsing helpers, the article store, the
+discovery helpers and the feed writer report into whichever collector is
+current. Outside a run, nothing is collected.
+
+Stage times are wall-clock: overlapping requests count once in "fetch".
+  discovery  from the start until the first article fetch (or the feed write)
+  fetch      at least one HTTP request in flight
+  parse      building BeautifulSoup trees
+  extract    reading the parsed article pages (the parsed() blocks)
+  serialize  writing the feed
+
+Worker processes save their collector under CACHE_DIR/metrics and the parent
+merges them into the report.
+"""
+import contextlib
+import contextvars
+import datetime
+import json
+import math
+import os
+import time
+
+from scrapers import config
+
+REPORT_PATH = os.path.join("feed", "metrics.json")
+STAGES = ("discovery", "fetch", "parse", "extract", "serialize")
+
+_current = contextvars.ContextVar("metrics", default=None)
+
+def _percentile(values, fraction):
+    # Nearest-rank percentile of a sorted list
+    if not values:
+        return None
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+class ScraperMetrics:
+    """Numbers collected while one scraper runs."""
+
+    def __init__(self, name):
+        self.name = name
+        self.counters = dict.fromkeys(("requests", "cache_hits", "store_hits", "retries", "deadline_skips", "bytes", "items_discovered",
+                                       "items_filtered", "items_emitted", "output_bytes"), 0)
+        self.latencies = []
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self._active = {}  # stage -> [nesting depth, start time]
+        self.started = time.perf_counter()
+        self.duration = None
+        self._discovery_done = False
+
+    def add(self, name, value=1):
+        self.counters[name] += value
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Times a stage. Nested or concurrent uses of the same stage count once."""
+        active = self._active.setdefault(name, [0, 0.0])
+        if active[0] == 0:
+            active[1] = time.perf_counter()
+        active[0] += 1
+        try:
+            yield
+        finally:
+            active[0] -= 1
+            if active[0] == 0:
+                self.stages[name] += time.perf_counter() - active[1]
+
+    def end_discovery(self):
+        if not self._discovery_done:
+            self._discovery_done = True
+            self.stages["discovery"] = time.perf_counter() - self.started
+
+    def request(self, latency, nbytes, cache_hit):
+        self.counters["requests"] += 1
+        self.counters["bytes"] += nbytes
+        if cache_hit:
+            self.counters["cache_hits"] += 1
+        self.latencies.append(latency)
+
+    def to_dict(self):
+        latencies = sorted(self.latencies)
+        round_ms = lambda seconds: None if seconds is None else round(seconds * 1000, 1)
+        return {
+            "duration_ms": round_ms(self.duration),
+            "requests": self.counters["requests"],
+            "cache_hits": self.counters["cache_hits"],
+            "store_hits": self.counters["store_hits"],
+            "retries": self.counters["retries"],
+            "deadline_skips": self.counters["deadline_skips"],
+            "bytes_downloaded": self.counters["bytes"],
+            "latency_ms": {
+                "p50": round_ms(_percentile(latencies, 0.50)),
+                "p95": round_ms(_percentile(latencies, 0.95)),
+                "max": round_ms(latencies[-1] if latencies else None),
+            },
+            "stages_ms": {stage: round_ms(seconds) for stage, seconds in self.stages.items()},
+            "items": {
+                "discovered": self.counters["items_discovered"],
+                "filtered": self.counters["items_filtered"],
+                "emitted": self.counters["items_emitted"],
+            },
+            "output_bytes": self.counters["output_bytes"],
+        }
+
+    def save(self):
+        """Saves the collector for the parent process to merge (see write_report)."""
+        os.makedirs(_partial_dir(), exist_ok=True)
+        with open(_partial_path(self.name), "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+@contextlib.contextmanager
+def collecting(name):
+    """
+    Makes a new collector current for the duration of the block and yields it.
+    The collector is saved for write_report() when the block exits.
+    """
+    collector = ScraperMetrics(name)
+    token = _current.set(collector)
+    try:
+        yield collector
+    finally:
+        collector.end_discovery()
+        collector.duration = time.perf_counter() - collector.started
+        _current.reset(token)
+        collector.save()
+
+def add(name, value=1):
+    collector = _current.get()
+    if collector:
+        collector.add(name, value)
+
+def stage(name):
+    collector = _current.get()
+    return collector.stage(name) if collector else contextlib.nullcontext()
+
+def end_discovery():
+    collector = _current.get()
+    if collector:
+        collector.end_discovery()
+
+def request(latency, nbytes, cache_hit=False):
+    collector = _current.get()
+    if collector:
+        collector.request(latency, nbytes, cache_hit)
+
+def _partial_dir():
+    return os.path.join(config.CACHE_DIR, "metrics")
+
+def _partial_path(name):
+    return os.path.join(_partial_dir(), f"{name}.json")
+
+def clear_partials():
+    """Removes collectors left over from an interrupted run."""
+    if os.path.isdir(_partial_dir()):
+        for entry in os.scandir(_partial_dir()):
+            os.remove(entry.path)
+
+def write_report(statuses, path=REPORT_PATH):
+    """
+    Writes the metrics of every scraper in statuses ({name: status}) to path.
+    Scrapers that saved no collector (e.g. killed on timeout) get only their status.
+    """
+    scrapers = {}
+    for name, status in statuses.items():
+        try:
+            with open(_partial_path(name), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.remove(_partial_path(name))
+        except (OSError, ValueError):
+            entry = {}
+        scrapers[name] = {"status": status, **entry}
+
+    report = {
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "scrapers": scrapers,
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {path}")
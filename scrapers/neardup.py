@@ -0,0 +1,106 @@
+"""
+Near-duplicate detection across sources (SimHash with LSH banding).
+
+The same announcement is often posted on several blogs, e.g. a partnership
+on both nvidia.com and amd.com. Within one scraper, duplicates are found by
+URL; across sources the URLs differ, so the article text is compared instead.
+
+Each archived article gets a 64-bit SimHash of the 3-word shingles of its
+title and text. Similar texts have fingerprints that differ in few bits.
+Fingerprints are stored in the archive next to the content hash they were
+computed from, so later runs only hash new or changed articles.
+
+Comparing every pair would be quadratic. Index splits each fingerprint into
+NEAR_DUP_DISTANCE + 1 bands: two fingerprints that differ in at most
+NEAR_DUP_DISTANCE bits are equal in at least one band, so only the
+articles that share a band are compared.
+
+The combined feed keeps the newest article of a group and lists the others
+under it, so each story appears once. NEAR_DUP_DISTANCE=-1 turns this off.
+"""
+import hashlib
+import re
+
+from scrapers import config
+
+BITS = 64
+SHINGLE = 3
+
+_TAGS = re.compile(r"<[^>]*>")
+_WORDS = re.compile(r"\w+")
+
+def text(title, description):
+    """The words of an article, lower-cased, without markup."""
+    return _WORDS.findall(f"{title or ''} {_TAGS.sub(' ', description or '')}".lower())
+
+def simhash(words):
+    """64-bit SimHash of the SHINGLE-word shingles of words."""
+    shingles = {" ".join(words[i:i + SHINGLE]) for i in range(max(len(words) - SHINGLE + 1, 1))}
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+              for shingle in shingles]
+    # Bit i is set when most shingle hashes have it set
+    half = len(hashes) / 2
+    fingerprint = 0
+    for bit in range(BITS):
+        if sum(h >> bit & 1 for h in hashes) > half:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def fingerprint(title, description):
+    """SimHash of an article, as the hex text stored in the archive."""
+    return format(simhash(text(title, description)), "016x")
+
+def distance(a, b):
+    return bin(a ^ b).count("1")
+
+class Index:
+    """LSH index of fingerprints; finds those within NEAR_DUP_DISTANCE bits."""
+
+    def __init__(self, max_distance=None):
+        self.max_distance = config.NEAR_DUP_DISTANCE if max_distance is None else max_distance
+        bands = self.max_distance + 1
+        width = BITS // bands
+        # The last band takes the bits left over
+        self.bands = [(i * width, BITS - i * width if i == bands - 1 else width) for i in range(bands)]
+        self.buckets = {}
+
+    def _keys(self, fingerprint):
+        return [(start, fingerprint >> start & ((1 << width) - 1)) for start, width in self.bands]
+
+    def add(self, fingerprint, value):
+        for key in self._keys(fingerprint):
+            self.buckets.setdefault(key, []).append((fingerprint, value))
+
+    def matches(self, fingerprint):
+        """Values added with a fingerprint within max_distance bits, each once."""
+        seen = set()
+        for key in self._keys(fingerprint):
+            for other, value in self.buckets.get(key, ()):
+                if id(value) not in seen and distance(fingerprint, other) <= self.max_distance:
+                    seen.add(id(value))
+                    yield value
+
+def collapse(entries, fingerprints):
+    """
+    Yields the entries (combined feed entries, newest first) that are not a
+    near-duplicate of an earlier entry from another source. The duplicates
+    are appended to the "duplicates" list of the entry they match.
+    fingerprints maps GUIDs to their hex fingerprint.
+    """
+    if config.NEAR_DUP_DISTANCE < 0:
+        yield from entries
+        return
+    index = Index()
+    for entry in entries:
+        fingerprint = fingerprints.get(entry["guid"])
+        if fingerprint is None:
+            yield entry
+            continue
+        fingerprint = int(fingerprint, 16)
+        match = next((kept for kept in index.matches(fingerprint)
+                      if kept["source"]["source"] != entry["source"]["source"]), None)
+        if match is not None:
+            match.setdefault("duplicates", []).append(entry)
+            continue
+        index.add(fingerprint, entry)
+        yield entry
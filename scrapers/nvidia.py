@@ -1,11 +1,18 @@
-import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from rfeed import *
 import datetime
-import xml.dom.minidom
-import os
 import re
 
+from scrapers import transport
+from scrapers.discovery import fetch_newest, is_recent
+from scrapers.archive import first_seen
+from scrapers.feedwriter import write_feed
+from scrapers.parsing import AnyOf, parse_html, parsed, with_class
+from scrapers.store import ArticleStore
+
+# Article pages: the meta tags (date, description) and the article body
+ARTICLE_STRAINER = AnyOf(SoupStrainer('meta'), SoupStrainer('div', class_=with_class('entry-content')))
+
 def extract_text(soup_element):
     # Remove unwanted tags
     for tag in soup_element.find_all(['script', 'style']):
@@ -19,20 +26,82 @@ def extract_text(soup_element):
     return text
 
 class NvidiaScraper:
+    async def fetch_article(self, entry):
+        """
+        Fetches the article page for its publication date and full content.
+        Returns (pubDate, description), or None if the page can't be fetched.
+        pubDate is None if the page has no date. The listing excerpt is kept as
+        description if the page has no content.
+        """
+        link = entry['link']
+        description = entry['excerpt']
+        pub_date = None
+        try:
+            # print(f"Fetching article: {link}")
+            art_response = await transport.get(link)
+            art_response.raise_for_status()
+            
+            with parsed(art_response, ARTICLE_STRAINER) as art_soup:
+                # <meta property="article:published_time" content="2025-12-02T16:00:27+00:00" />
+                meta_date = art_soup.find('meta', property='article:published_time')
+                if meta_date:
+                    date_str = meta_date.get('content')
+                    # Parse ISO format
+                    # 2025-12-02T16:00:27+00:00
+                    try:
+                        pub_date = datetime.datetime.fromisoformat(date_str)
+                    except ValueError:
+                        # Handle potential parsing errors or different formats
+                        pass
+            
+                # Get full content
+                content_div = art_soup.find('div', class_='entry-content')
+                if content_div:
+                    # Remove reading time if present
+                    reading_time = content_div.find('span', class_='bsf-rt-reading-time')
+                    if reading_time:
+                        reading_time.decompose()
+                
+                    # Remove social placeholder if present
+                    social_placeholder = content_div.find('div', class_='has-social-placeholder')
+                    if social_placeholder:
+                        social_placeholder.decompose()
+
+                    description = extract_text(content_div)
+            
+                # Fallback to meta description if content extraction failed
+                if not description:
+                    meta_desc = art_soup.find('meta', attrs={'name': 'description'})
+                    if not meta_desc:
+                        meta_desc = art_soup.find('meta', property='og:description')
+                
+                    if meta_desc:
+                        description = meta_desc.get('content')
+                    
+        except Exception as e:
+            print(f"Failed to fetch/parse article {link}: {e}")
+            return None
+
+        return pub_date, description
+
     def generate_feed(self):
+        return transport.run(self.agenerate_feed())
+
+    async def agenerate_feed(self):
         url = "https://blogs.nvidia.com/blog/category/generative-ai/"
         try:
-            response = requests.get(url)
+            response = await transport.get(url)
             response.raise_for_status()
-        except requests.RequestException as e:
+        except transport.RequestException as e:
             print(f"Error fetching URL: {e}")
             return
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = parse_html(response, SoupStrainer('article'))
         
         # Find all articles
         articles = soup.find_all('article')
         
+        entries = []
         items = []
         seen_links = set()
         
@@ -72,59 +141,40 @@ class NvidiaScraper:
                 if p_tag:
                     description = p_tag.get_text(strip=True)
             
-            # Fetch article page for date and description
-            pub_date = datetime.datetime.now(datetime.timezone.utc)
-            try:
-                # print(f"Fetching article: {link}")
-                art_response = requests.get(link)
-                art_response.raise_for_status()
-                art_soup = BeautifulSoup(art_response.content, 'html.parser')
-                
-                # <meta property="article:published_time" content="2025-12-02T16:00:27+00:00" />
-                meta_date = art_soup.find('meta', property='article:published_time')
-                if meta_date:
-                    date_str = meta_date.get('content')
-                    # Parse ISO format
-                    # 2025-12-02T16:00:27+00:00
-                    try:
-                        pub_date = datetime.datetime.fromisoformat(date_str)
-                    except ValueError:
-                        # Handle potential parsing errors or different formats
-                        pass
-                
-                # Get full content
-                content_div = art_soup.find('div', class_='entry-content')
-                if content_div:
-                    # Remove reading time if present
-                    reading_time = content_div.find('span', class_='bsf-rt-reading-time')
-                    if reading_time:
-                        reading_time.decompose()
-                    
-                    # Remove social placeholder if present
-                    social_placeholder = content_div.find('div', class_='has-social-placeholder')
-                    if social_placeholder:
-                        social_placeholder.decompose()
+            entries.append({
+                'title': title,
+                'link': link,
+                'excerpt': description
+            })
+
+        # Fetch article pages concurrently. The listing is newest first but has
+        # no dates, so fetching stops once the pages get older than the
+        # lookback window.
+        store = ArticleStore("nvidia")
+        details = await fetch_newest(
+            lambda batch: store.fetch_all(
+                self.fetch_article, batch,
+                key=lambda entry: entry['link'],
+                fingerprint=lambda entry: [entry['title'], entry['excerpt']]
+            ),
+            entries, date=lambda article_details: article_details[0]
+        )
+
+        for entry, article_details in zip(entries, details):
+            if article_details is None:
+                article_details = (None, entry['excerpt'])
+            pub_date, description = article_details
+            # Undated articles keep the date they were first seen
+            pub_date = pub_date or first_seen(entry['link'])
+            if not is_recent(pub_date):
+                continue
 
-                    description = extract_text(content_div)
-                
-                # Fallback to meta description if content extraction failed
-                if not description:
-                    meta_desc = art_soup.find('meta', attrs={'name': 'description'})
-                    if not meta_desc:
-                        meta_desc = art_soup.find('meta', property='og:description')
-                    
-                    if meta_desc:
-                        description = meta_desc.get('content')
-                        
-            except Exception as e:
-                print(f"Failed to fetch/parse article {link}: {e}")
-                
             item = Item(
-                title=title,
-                link=link,
+                title=entry['title'],
+                link=entry['link'],
                 description=description,
                 author="NVIDIA",
-                guid=Guid(link),
+                guid=Guid(entry['link']),
                 pubDate=pub_date
             )
             items.append(item)
@@ -141,27 +191,7 @@ class NvidiaScraper:
             items=items
         )
         
-        rss_content = feed.rss()
-        dom = xml.dom.minidom.parseString(rss_content)
-        pretty_xml = dom.toprettyxml(indent="  ")
-        # Inject stylesheet
-        pretty_xml = pretty_xml.replace('<?xml version="1.0" ?>', '<?xml version="1.0" ?>\n<?xml-stylesheet type="text/xsl" href="style.xsl"?>')
-        
-        
-        # Post-process to add CDATA
-        def replace_cdata(match):
-            content = match.group(1)
-            # Unescape basic XML entities
-            content = content.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&').replace('&quot;', '"').replace('&apos;', "'")
-            return f"<description><![CDATA[{content}]]></description>"
-            
-        pretty_xml = re.sub(r'<description>(.*?)</description>', replace_cdata, pretty_xml, flags=re.DOTALL)
-        
-        os.makedirs("feed", exist_ok=True)
-        
-        with open("feed/nvidia.xml", "w") as f:
-            f.write(pretty_xml)
-        print(f"Generated feed/nvidia.xml with {len(items)} items.")
+        write_feed(feed, "feed/nvidia.xml")
 
 if __name__ == "__main__":
     scraper = NvidiaScraper()
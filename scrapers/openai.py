@@ -1,9 +1,13 @@
-import cloudscraper
-from bs4 import BeautifulSoup
 import rfeed
 from datetime import datetime, timezone
 import re
-import xml.dom.minidom
+
+from scrapers import transport
+from scrapers.discovery import select_recent
+from scrapers.archive import first_seen
+from scrapers.feedwriter import write_feed
+from scrapers.parsing import parse_xml, parsed
+from scrapers.store import ArticleStore
 
 def clean_text(text):
     """
@@ -18,68 +22,53 @@ def clean_text(text):
     text = re.sub(r'\s+', ' ', text)
     return text.strip()
 
-def replace_cdata(xml_string):
-    """
-    Post-processing to correctly wrap descriptions in CDATA.
-    Unescapes HTML entities inside the description and wraps in CDATA.
-    """
-    # Pattern to find <description> content
-    pattern = r'<description>(.*?)</description>'
-    
-    def replacer(match):
-        content = match.group(1)
-        # Unescape common HTML entities that might have been escaped by minidom
-        content = content.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&').replace('&quot;', '"').replace('&apos;', "'")
-        return f'<description><![CDATA[{content}]]></description>'
-    
-    return re.sub(pattern, replacer, xml_string, flags=re.DOTALL)
-
 class OpenAIScraper:
+    # Most article pages fetched per run
+    MAX_ARTICLES = 30
+
     def __init__(self):
         self.rss_url = "https://openai.com/news/rss.xml"
-        self.scraper = cloudscraper.create_scraper()
 
-    def fetch_article_content(self, url):
+    async def fetch_article_content(self, url):
         """
         Fetches the full content of the article to provide a longer description.
         """
         print(f"Fetching details for: {url}")
         try:
-            response = self.scraper.get(url)
+            response = await transport.get(url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
+            with parsed(response) as soup:
+                # OpenAI articles structure varies, but usually content is in main
+                # or in a specific block.
+                content = ""
             
-            # OpenAI articles structure varies, but usually content is in main
-            # or in a specific block.
-            content = ""
+                # Try to find the main content container
+                # 1. 'ui-block--text' is common in their new design
+                content_divs = soup.find_all(class_=lambda x: x and 'ui-block' in x)
             
-            # Try to find the main content container
-            # 1. 'ui-block--text' is common in their new design
-            content_divs = soup.find_all(class_=lambda x: x and 'ui-block' in x)
+                paragraphs = []
             
-            paragraphs = []
-            
-            if content_divs:
-                for div in content_divs:
-                    for p in div.find_all('p'):
-                         text = clean_text(p.get_text(strip=True))
-                         if text:
-                             paragraphs.append(text)
-            else:
-                 # Fallback: find all paragraphs in main or article
-                 container = soup.find('article') or soup.find('main') or soup.body
-                 if container:
-                     for p in container.find_all('p'):
-                         # Filter out short/navigational text
-                         text = clean_text(p.get_text(strip=True))
-                         if len(text) > 50: # arbitrary filter for "content-like" paragraphs
-                             paragraphs.append(text)
+                if content_divs:
+                    for div in content_divs:
+                        for p in div.find_all('p'):
+                             text = clean_text(p.get_text(strip=True))
+                             if text:
+                                 paragraphs.append(text)
+                else:
+                     # Fallback: find all paragraphs in main or article
+                     container = soup.find('article') or soup.find('main') or soup.body
+                     if container:
+                         for p in container.find_all('p'):
+                             # Filter out short/navigational text
+                             text = clean_text(p.get_text(strip=True))
+                             if len(text) > 50: # arbitrary filter for "content-like" paragraphs
+                                 paragraphs.append(text)
 
-            if paragraphs:
-                # Join with explicit line breaks for readability in feed readers that support it, 
-                # or just space. HTML description is usually best.
-                # Let's use HTML paragraphs.
-                content = "".join([f"<p>{p}</p>" for p in paragraphs])
+                if paragraphs:
+                    # Join with explicit line breaks for readability in feed readers that support it, 
+                    # or just space. HTML description is usually best.
+                    # Let's use HTML paragraphs.
+                    content = "".join([f"<p>{p}</p>" for p in paragraphs])
             
             return content
 
@@ -88,19 +77,21 @@ class OpenAIScraper:
             return None
 
     def generate_feed(self):
+        return transport.run(self.agenerate_feed())
+
+    async def agenerate_feed(self):
         print(f"Fetching RSS feed from {self.rss_url}...")
         try:
-            response = self.scraper.get(self.rss_url)
+            response = await transport.get(self.rss_url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'xml')
+            soup = parse_xml(response)
             
             items = soup.find_all('item')
-            # Limit to recent items to avoid long running times
-            items = items[:30]
             feed_items = []
             
-            print(f"Found {len(soup.find_all('item'))} items in RSS feed. Processing recent {len(items)}...")
+            print(f"Found {len(items)} items in RSS feed. Processing...")
             
+            entries = []
             for item in items:
                 title = item.find('title').get_text(strip=True)
                 link = item.find('link').get_text(strip=True)
@@ -114,25 +105,42 @@ class OpenAIScraper:
                     try: 
                         pub_date = datetime.strptime(pub_date_str, "%a, %d %b %Y %H:%M:%S %z")
                     except ValueError:
-                         pub_date = datetime.now(timezone.utc)
+                         pub_date = first_seen(link)
                 
                 # Original description
                 description = item.find('description').get_text(strip=True) if item.find('description') else ""
                 
-                # Enrich content
-                full_content = self.fetch_article_content(link)
-                
+                entries.append({
+                    'title': title,
+                    'link': link,
+                    'pubDate': pub_date,
+                    'description': description
+                })
+            
+            # Limit to recent items to avoid long running times
+            entries = select_recent(entries, budget=self.MAX_ARTICLES)
+            
+            # Enrich content, fetching article pages concurrently
+            store = ArticleStore("openai")
+            contents = await store.fetch_all(
+                lambda entry: self.fetch_article_content(entry['link']), entries,
+                key=lambda entry: entry['link'],
+                fingerprint=lambda entry: [entry['title'], entry['description']]
+            )
+            
+            for entry, full_content in zip(entries, contents):
+                description = entry['description']
                 if full_content:
                     description = full_content
                 else:
-                    print(f"Using original description for {link}")
+                    print(f"Using original description for {entry['link']}")
 
                 feed_item = rfeed.Item(
-                    title=title,
-                    link=link,
+                    title=entry['title'],
+                    link=entry['link'],
                     description=description,
-                    pubDate=pub_date,
-                    guid=rfeed.Guid(link)
+                    pubDate=entry['pubDate'],
+                    guid=rfeed.Guid(entry['link'])
                 )
                 feed_items.append(feed_item)
             
@@ -146,20 +154,7 @@ class OpenAIScraper:
                 items=feed_items
             )
             
-            xml_output = feed.rss()
-            
-            dom = xml.dom.minidom.parseString(xml_output)
-            pretty_xml = dom.toprettyxml(indent="  ")
-            
-            # Inject stylesheet
-            pretty_xml = pretty_xml.replace('<?xml version="1.0" ?>', '<?xml version="1.0" ?>\n<?xml-stylesheet type="text/xsl" href="style.xsl"?>')
-            
-            final_xml = replace_cdata(pretty_xml)
-            
-            with open("feed/openai.xml", "w", encoding='utf-8') as f:
-                f.write(final_xml)
-                
-            print("Generated feed/openai.xml")
+            write_feed(feed, "feed/openai.xml")
 
         except Exception as e:
             print(f"Error generating feed: {e}")
@@ -1,25 +1,29 @@
-import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 import rfeed
-from datetime import datetime, timedelta, timezone
-import cloudscraper
+from datetime import datetime, timezone
 import json
 
-import requests
-from bs4 import BeautifulSoup
-import rfeed
-from datetime import datetime, timedelta, timezone
-import cloudscraper
-import json
+from scrapers import config, metrics, transport
+from scrapers.discovery import is_recent
+from scrapers.archive import first_seen
+from scrapers.feedwriter import write_feed
+from scrapers.parsing import parse_html
 
 class PalantirScraper:
     def generate_feed(self):
-        scraper = cloudscraper.create_scraper()
+        return transport.run(self.agenerate_feed())
+
+    async def agenerate_feed(self):
         url = "https://www.palantir.com/newsroom/press-releases/"
         
         print(f"Fetching {url}...")
-        response = scraper.get(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        try:
+            response = await transport.get(url)
+        except transport.RequestException as e:
+            # e.g. CircuitOpenError; the last published feed stays in place
+            print(f"Error fetching URL: {e}")
+            return
+        soup = parse_html(response, SoupStrainer('script', id='__NEXT_DATA__'))
         
         articles = []
         
@@ -62,7 +66,7 @@ class PalantirScraper:
                         
                     # Parse date
                     # Format: 2018-09-04T00:00-07:00
-                    pub_date = datetime.now(timezone.utc)
+                    pub_date = None
                     if date_str:
                         try:
                             pub_date = datetime.fromisoformat(date_str)
@@ -71,13 +75,13 @@ class PalantirScraper:
                                  pub_date = pub_date.replace(tzinfo=timezone.utc)
                         except ValueError:
                             pass
-                    
-                    description = f"<![CDATA[{headline}]]>"
+                    if pub_date is None:
+                        pub_date = first_seen(link)
                     
                     item = rfeed.Item(
                         title=headline,
                         link=link,
-                        description=description,
+                        description=headline,
                         pubDate=pub_date,
                         guid=rfeed.Guid(link)
                     )
@@ -93,11 +97,11 @@ class PalantirScraper:
         # Sort articles by pubDate descending
         articles.sort(key=lambda x: x.pubDate, reverse=True)
         
-        # Filter articles (last 2 months)
-        cutoff_date = datetime.now(timezone.utc) - timedelta(days=60)
+        # Filter articles (lookback window)
         original_count = len(articles)
-        articles = [a for a in articles if a.pubDate >= cutoff_date]
-        print(f"Filtered {original_count - len(articles)} articles older than 60 days. Remaining: {len(articles)}")
+        metrics.add("items_discovered", original_count)
+        articles = [a for a in articles if is_recent(a.pubDate)]
+        print(f"Filtered {original_count - len(articles)} articles older than {config.LOOKBACK_DAYS} days. Remaining: {len(articles)}")
     
         feed = rfeed.Feed(
             title="Palantir Press Releases",
@@ -108,25 +112,7 @@ class PalantirScraper:
             items=articles
         )
     
-        xml_str = feed.rss()
-        
-        # Format XML
-        try:
-            from xml.dom import minidom
-            dom = minidom.parseString(xml_str)
-            pretty_xml = dom.toprettyxml(indent="  ")
-            # Inject stylesheet
-            pretty_xml = pretty_xml.replace('<?xml version="1.0" ?>', '<?xml version="1.0" ?>\n<?xml-stylesheet type="text/xsl" href="style.xsl"?>')
-            # Remove extra blank lines that minidom might introduce
-            pretty_xml = "\n".join([line for line in pretty_xml.split('\n') if line.strip()])
-        except Exception as e:
-            print(f"Error formatting XML: {e}")
-            pretty_xml = xml_str
-    
-        with open("feed/palantir.xml", "w") as f:
-            f.write(pretty_xml)
-        
-        print("Generated feed/palantir.xml")
+        write_feed(feed, "feed/palantir.xml")
 
 if __name__ == "__main__":
     scraper = PalantirScraper()
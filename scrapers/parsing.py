@@ -0,0 +1,69 @@
+"""
+Shared HTML parsing helpers.
+
+Pages are parsed from the raw response bytes with the lxml tree builder,
+which is faster than html.parser. The charset comes from the
+Content-Type header when there is one, so BeautifulSoup does not have to guess
+it. Scrapers usually need only a small part of a page, so they pass a
+SoupStrainer and only the matching elements are built. parsed() frees the tree
+as soon as the extraction is done.
+"""
+from contextlib import contextmanager
+import re
+
+from bs4 import BeautifulSoup, ElementFilter
+
+from scrapers import metrics, trace
+
+def with_class(css_class):
+    """
+    Attribute matcher for SoupStrainer, e.g. SoupStrainer('div', class_=with_class('entry-content')).
+    While parsing, class values are still whole strings like "a entry-content",
+    so a plain class_='entry-content' would miss elements that have several classes.
+    """
+    def match(value):
+        if value is None:
+            return False
+        classes = value.split() if isinstance(value, str) else value
+        return css_class in classes
+    return match
+
+def _charset(response):
+    match = re.search(r"charset=([\w-]+)", response.headers.get("content-type") or "", re.I)
+    return match.group(1) if match else None
+
+def parse_html(response, only=None):
+    """
+    Parses a response body with lxml. only is an optional SoupStrainer (or
+    AnyOf); when given, just the matching elements and their subtrees are built.
+    """
+    with metrics.stage("parse"), trace.span("parse", "parse", url=response.url):
+        return BeautifulSoup(response.content, "lxml", parse_only=only, from_encoding=_charset(response))
+
+def parse_xml(response):
+    """Parses an RSS/XML response body."""
+    with metrics.stage("parse"), trace.span("parse", "parse", url=response.url):
+        return BeautifulSoup(response.content, "xml")
+
+@contextmanager
+def parsed(response, only=None):
+    """Like parse_html(), but decomposes the tree when the block exits."""
+    soup = parse_html(response, only)
+    try:
+        with metrics.stage("extract"), trace.span("extract", "extract", url=response.url):
+            yield soup
+    finally:
+        soup.decompose()
+
+class AnyOf(ElementFilter):
+    """Parse filter that keeps every element matched by at least one of the given SoupStrainers."""
+
+    def __init__(self, *strainers):
+        super().__init__()
+        self.strainers = strainers
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return any(strainer.allow_tag_creation(nsprefix, name, attrs) for strainer in self.strainers)
+
+    def allow_string_creation(self, string):
+        return False
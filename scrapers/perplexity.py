@@ -1,11 +1,20 @@
-from curl_cffi import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 import rfeed
-from datetime import datetime, timedelta, timezone
+from datetime import datetime
 import re
 import json
 
+from scrapers import config, transport
+from scrapers.discovery import fetch_newest, is_recent
+from scrapers.archive import first_seen
+from scrapers.feedwriter import write_feed
+from scrapers.parsing import parse_html, parsed
+from scrapers.store import ArticleStore
+
 class PerplexityScraper:
+    # Most article pages fetched per run
+    MAX_ARTICLES = 15
+
     def extract_text(self, soup):
         # Find the first p.framer-text that looks like body content
         # We look for a paragraph with substantial length to avoid headers/footers
@@ -44,15 +53,63 @@ class PerplexityScraper:
         
         return full_text
 
+    async def fetch_article(self, link):
+        """
+        Fetches and parses one article page. Returns a dict of its details, or
+        None on failure. pubDate is None if the page has no date.
+        """
+        print(f"Processing {link}...")
+        try:
+            art_response = await transport.get(link)
+            if art_response.status_code != 200:
+                # e.g. a Cloudflare challenge; returning None keeps it out of the store
+                print(f"Failed to fetch article {link}: {art_response.status_code}")
+                return None
+            with parsed(art_response) as art_soup:
+                title = art_soup.title.string if art_soup.title else "No Title"
+                if title is not None:
+                    # Detach from the tree, which is freed on exit
+                    title = str(title)
+            
+                # Extract date from JSON-LD
+                pub_date = None
+                json_ld = art_soup.find('script', type='application/ld+json')
+                if json_ld:
+                    try:
+                        data = json.loads(json_ld.string)
+                        if 'datePublished' in data:
+                            pub_date = datetime.fromisoformat(data['datePublished'].replace('Z', '+00:00'))
+                    except:
+                        pass
+            
+                description = self.extract_text(art_soup)
+            
+            return {
+                'title': title,
+                'pubDate': pub_date,
+                'description': description
+            }
+            
+        except Exception as e:
+            print(f"Error processing {link}: {e}")
+            return None
+
     def generate_feed(self):
+        return transport.run(self.agenerate_feed())
+
+    async def agenerate_feed(self):
         url = "https://www.perplexity.ai/hub"
         
         print(f"Fetching {url}...")
-        response = requests.get(url, impersonate="chrome")
-        soup = BeautifulSoup(response.text, 'html.parser')
+        try:
+            response = await transport.get(url)
+        except transport.RequestException as e:
+            # e.g. CircuitOpenError; the last published feed stays in place
+            print(f"Error fetching URL: {e}")
+            return
+        soup = parse_html(response, SoupStrainer(['a', 'title']))
         
-        articles = []
-        links = set()
+        links = []
         
         # Extract article links
         for a in soup.find_all('a', href=True):
@@ -63,7 +120,8 @@ class PerplexityScraper:
                     href = href[1:]
                 if not href.startswith('http'):
                     href = f"https://www.perplexity.ai{href}"
-                links.add(href)
+                if href not in links:
+                    links.append(href)
                 
         print(f"Found {len(links)} articles.")
         
@@ -76,52 +134,37 @@ class PerplexityScraper:
             if "Just a moment" in response.text:
                 print("POSSIBLE CLOUDFLARE BLOCK DETECTED")
         
-        # Process articles (limit to 15 for now to avoid long runtimes/rate limits)
-        for link in sorted(list(links))[:15]:
-            print(f"Processing {link}...")
-            try:
-                art_response = requests.get(link, impersonate="chrome")
-                art_soup = BeautifulSoup(art_response.text, 'html.parser')
-                
-                title = art_soup.title.string if art_soup.title else "No Title"
-                
-                # Extract date from JSON-LD
-                pub_date = datetime.now(timezone.utc)
-                json_ld = art_soup.find('script', type='application/ld+json')
-                if json_ld:
-                    try:
-                        data = json.loads(json_ld.string)
-                        if 'datePublished' in data:
-                            pub_date = datetime.fromisoformat(data['datePublished'].replace('Z', '+00:00'))
-                    except:
-                        pass
-                
-                description = self.extract_text(art_soup)
-                
-                # Wrap description in CDATA
-                description = f"<![CDATA[{description}]]>"
-                
-                item = rfeed.Item(
-                    title=title,
-                    link=link,
-                    description=description,
-                    pubDate=pub_date,
-                    guid=rfeed.Guid(link)
-                )
-                articles.append(item)
-                
-            except Exception as e:
-                print(f"Error processing {link}: {e}")
+        # The hub lists posts newest first but without dates, so article pages are
+        # fetched in hub order until they get older than the lookback window
+        # (at most MAX_ARTICLES, to avoid long runtimes/rate limits).
+        # The hub only lists links, so known articles are never re-fetched unless marked as changed
+        store = ArticleStore("perplexity")
+        results = await fetch_newest(
+            lambda batch: store.fetch_all(self.fetch_article, batch, key=lambda link: link), links,
+            date=lambda details: details['pubDate'], budget=self.MAX_ARTICLES
+        )
+        
+        articles = []
+        for link, details in zip(links, results):
+            if details is None:
                 continue
+            item = rfeed.Item(
+                title=details['title'],
+                link=link,
+                description=details['description'],
+                # Undated pages keep the date they were first seen
+                pubDate=details['pubDate'] or first_seen(link),
+                guid=rfeed.Guid(link)
+            )
+            articles.append(item)
     
         # Sort articles by pubDate descending
         articles.sort(key=lambda x: x.pubDate, reverse=True)
         
-        # Filter articles (last 2 months)
-        cutoff_date = datetime.now(timezone.utc) - timedelta(days=60)
+        # Filter articles (lookback window)
         original_count = len(articles)
-        articles = [a for a in articles if a.pubDate >= cutoff_date]
-        print(f"Filtered {original_count - len(articles)} articles older than 60 days. Remaining: {len(articles)}")
+        articles = [a for a in articles if is_recent(a.pubDate)]
+        print(f"Filtered {original_count - len(articles)} articles older than {config.LOOKBACK_DAYS} days. Remaining: {len(articles)}")
     
         feed = rfeed.Feed(
             title="Perplexity AI Hub",
@@ -132,25 +175,7 @@ class PerplexityScraper:
             items=articles
         )
     
-        xml_str = feed.rss()
-        
-        # Format XML
-        try:
-            from xml.dom import minidom
-            dom = minidom.parseString(xml_str)
-            pretty_xml = dom.toprettyxml(indent="  ")
-            # Inject stylesheet
-            pretty_xml = pretty_xml.replace('<?xml version="1.0" ?>', '<?xml version="1.0" ?>\n<?xml-stylesheet type="text/xsl" href="style.xsl"?>')
-            # Remove extra blank lines that minidom might introduce
-            pretty_xml = "\n".join([line for line in pretty_xml.split('\n') if line.strip()])
-        except Exception as e:
-            print(f"Error formatting XML: {e}")
-            pretty_xml = xml_str
-    
-        with open("feed/perplexity.xml", "w") as f:
-            f.write(pretty_xml)
-        
-        print("Generated feed/perplexity.xml")
+        write_feed(feed, "feed/perplexity.xml")
 
 if __name__ == "__main__":
     scraper = PerplexityScraper()
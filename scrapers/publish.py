@@ -0,0 +1,162 @@
+"""
+Change-aware publishing of the files in feed/.
+
+Every published file has a manifest entry in CACHE_DIR/publish/<file>.json
+with a hash of its content. For feeds the hash leaves out lastBuildDate, so it
+only changes when the items or the channel do. A feed whose hash is unchanged
+keeps the lastBuildDate it was published with and comes out byte for byte as
+before. It is only written when the file on disk differs, e.g. after a fresh
+checkout. Files are written through a temporary file and a rename, so a
+crashed run never leaves a half-written feed behind.
+
+run_feeds.py takes a snapshot() of the manifest before the scrapers run and
+reports the files whose hash differs afterwards (changes()). In GitHub
+Actions the result is also written to $GITHUB_OUTPUT, so the deploy can be
+skipped when nothing changed. Entries are one file per feed, so --jobs
+workers never write the same file.
+
+precompress() then writes .gz (and, when the brotli module is installed, .br)
+copies of the feeds, index.html and style.xsl at maximum compression, so a
+static server can send them as they are. A copy carries the mtime of its
+source. Files that were not rewritten keep their mtime, so only changed
+files are compressed again.
+"""
+import hashlib
+import json
+import os
+
+from scrapers import config
+from scrapers.httpcache import write_atomic
+
+# Published files get the mode open() would give them, so web servers can read them.
+# The umask can only be read by setting it; this runs once, at import.
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+def _manifest_dir():
+    return os.path.join(config.CACHE_DIR, "publish")
+
+def _entry_path(path):
+    return os.path.join(_manifest_dir(), os.path.basename(path) + ".json")
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def entry(path):
+    """The manifest entry of a published file, or None."""
+    try:
+        with open(_entry_path(path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _on_disk(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def publish(path, text, digest=None, **extra):
+    """
+    Writes text to path unless the file already holds it, and records the
+    file's hash (digest, default the hash of text) plus any extra fields in
+    the manifest. Returns True if the hash changed since the last publish.
+    """
+    digest = digest or content_hash(text)
+    previous = entry(path)
+    if _on_disk(path) != text:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        write_atomic(path, text.encode("utf-8"), FILE_MODE)
+    elif os.stat(path).st_mode & 0o777 != FILE_MODE:
+        os.chmod(path, FILE_MODE)  # written 0600 before the mode fix
+    changed = previous is None or previous.get("hash") != digest
+    if changed or any(previous.get(key) != value for key, value in extra.items()):
+        os.makedirs(_manifest_dir(), exist_ok=True)
+        write_atomic(_entry_path(path), json.dumps({"hash": digest, **extra}).encode("utf-8"))
+    return changed
+
+# Files in feed/ that get compressed copies
+PRECOMPRESSED = (".xml", ".atom", ".json", ".jsonl", ".html", ".xsl")
+_EXCLUDED = {"metrics.json"}
+
+def _codecs():
+    """(suffix, compress function) of every available format, at maximum compression."""
+    # Imported here: run_feeds imports this module on its startup path
+    import gzip
+    codecs = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    try:
+        import brotli
+    except ImportError:  # optional: without it only .gz copies are written
+        return codecs
+    codecs.append((".br", lambda data: brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)))
+    return codecs
+
+def _compress(path, codecs):
+    """Writes the compressed copies of path that are missing or not from its current version. Returns their names."""
+    mtime = os.stat(path).st_mtime_ns
+
+    data = None
+    written = []
+    for suffix, compress in codecs:
+        target = path + suffix
+        try:
+            stat = os.stat(target)
+            if stat.st_mtime_ns == mtime:
+                # Copies from before the mode fix were written 0600
+                if stat.st_mode & 0o777 != FILE_MODE:
+                    os.chmod(target, FILE_MODE)
+                continue
+        except FileNotFoundError:
+            pass
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        write_atomic(target, compress(data), FILE_MODE)
+        os.utime(target, ns=(mtime, mtime))
+        written.append(os.path.basename(target))
+    return written
+
+def precompress(directory="feed"):
+    """Compresses every changed file in directory in parallel. Returns the names of the copies written."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    codecs = _codecs()
+    paths = [entry.path for entry in os.scandir(directory)
+             if entry.name.endswith(PRECOMPRESSED) and entry.name not in _EXCLUDED]
+    # zlib and brotli release the GIL while compressing, so threads run in parallel
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        written = sorted(name for names in pool.map(lambda path: _compress(path, codecs), paths) for name in names)
+    if written:
+        note = "" if len(codecs) > 1 else " (gzip only; install brotli for .br copies)"
+        print(f"Compressed {len(written)} files{note}")
+    return written
+
+def snapshot():
+    """{file name: hash} of everything in the manifest."""
+    hashes = {}
+    if os.path.isdir(_manifest_dir()):
+        for name in os.listdir(_manifest_dir()):
+            if name.endswith(".json"):
+                item = entry(name[:-len(".json")])
+                if item:
+                    hashes[name[:-len(".json")]] = item.get("hash")
+    return hashes
+
+def changes(before):
+    """Names of the files whose hash differs from the snapshot before, sorted."""
+    after = snapshot()
+    return sorted(name for name, digest in after.items() if before.get(name) != digest)
+
+def report(changed):
+    """Prints the changed files and exports them to the GitHub Actions step outputs."""
+    if changed:
+        print(f"Changed since the last publish: {', '.join(changed)}")
+    else:
+        print("No feed changed since the last publish")
+    output = os.environ.get("GITHUB_OUTPUT")
+    if output:
+        with open(output, "a", encoding="utf-8") as f:
+            f.write(f"changed={'true' if changed else 'false'}\n")
+            f.write(f"changed_files={','.join(changed)}\n")
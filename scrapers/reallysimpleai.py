@@ -1,12 +1,15 @@
-import requests
 from bs4 import BeautifulSoup
 from rfeed import *
 import datetime
-import xml.dom.minidom
-import os
 import re
 from dateutil import parser as date_parser
 
+from scrapers import transport
+from scrapers.discovery import select_recent
+from scrapers.archive import first_seen
+from scrapers.feedwriter import write_feed
+from scrapers.parsing import parse_xml
+
 class ReallySimpleAIScraper:
     def clean_html_content(self, html_content):
         """
@@ -16,7 +19,7 @@ class ReallySimpleAIScraper:
         if not html_content:
             return ""
 
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = BeautifulSoup(html_content, 'lxml')
 
         # Remove the "Message actions" container which contains buttons and CSS classes
         for div in soup.find_all('div', attrs={'aria-label': 'Message actions'}):
@@ -35,19 +38,22 @@ class ReallySimpleAIScraper:
         return text
 
     def generate_feed(self):
+        return transport.run(self.agenerate_feed())
+
+    async def agenerate_feed(self):
         rss_url = "https://reallysimpleai.blogspot.com/feeds/posts/default?alt=rss"
         try:
-            response = requests.get(rss_url)
+            response = await transport.get(rss_url)
             response.raise_for_status()
-        except requests.RequestException as e:
+        except transport.RequestException as e:
             print(f"Error fetching RSS URL: {e}")
             return
 
         # Parse RSS XML
-        soup = BeautifulSoup(response.content, 'xml')
+        soup = parse_xml(response)
         items = soup.find_all('item')
 
-        feed_items = []
+        entries = []
 
         print(f"Found {len(items)} items in RSS feed. Processing...")
 
@@ -66,23 +72,30 @@ class ReallySimpleAIScraper:
                     pub_date = date_parser.parse(pub_date_str)
                 except Exception as e:
                     print(f"Error parsing date {pub_date_str}: {e}")
-                    pub_date = datetime.datetime.now()
+                    pub_date = first_seen(link)
             else:
-                pub_date = datetime.datetime.now()
+                pub_date = first_seen(link)
 
-            description = ""
             rss_desc = item.find('description')
-            if rss_desc:
-                raw_html = rss_desc.get_text(strip=True)
-                description = self.clean_html_content(raw_html)
+            entries.append({
+                'title': title,
+                'link': link,
+                'pubDate': pub_date,
+                'raw_html': rss_desc.get_text(strip=True) if rss_desc else ""
+            })
 
+        # Only keep posts inside the lookback window
+        entries = select_recent(entries)
+
+        feed_items = []
+        for entry in entries:
             feed_item = Item(
-                title=title,
-                link=link,
-                description=description,
+                title=entry['title'],
+                link=entry['link'],
+                description=self.clean_html_content(entry['raw_html']),
                 author="Really Simple AI",
-                guid=Guid(link),
-                pubDate=pub_date
+                guid=Guid(entry['link']),
+                pubDate=entry['pubDate']
             )
             feed_items.append(feed_item)
 
@@ -98,27 +111,7 @@ class ReallySimpleAIScraper:
             items=feed_items
         )
 
-        rss_content = feed.rss()
-        dom = xml.dom.minidom.parseString(rss_content)
-        pretty_xml = dom.toprettyxml(indent="  ")
-
-        # Inject stylesheet
-        pretty_xml = pretty_xml.replace('<?xml version="1.0" ?>', '<?xml version="1.0" ?>\n<?xml-stylesheet type="text/xsl" href="style.xsl"?>')
-
-        # Post-process to add CDATA
-        def replace_cdata(match):
-            content = match.group(1)
-            # Unescape basic XML entities to avoid double escaping when wrapping in CDATA
-            content = content.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&').replace('&quot;', '"').replace('&apos;', "'")
-            return f"<description><![CDATA[{content}]]></description>"
-
-        pretty_xml = re.sub(r'<description>(.*?)</description>', replace_cdata, pretty_xml, flags=re.DOTALL)
-
-        os.makedirs("feed", exist_ok=True)
-
-        with open("feed/reallysimpleai.xml", "w") as f:
-            f.write(pretty_xml)
-        print(f"Generated feed/reallysimpleai.xml with {len(feed_items)} items.")
+        write_feed(feed, "feed/reallysimpleai.xml")
 
 if __name__ == "__main__":
     scraper = ReallySimpleAIScraper()
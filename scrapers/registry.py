@@ -0,0 +1,63 @@
+"""
+Registry of the scrapers run by run_feeds.py.
+
+Scrapers are listed by class name, module and the name of the feed they write
+(feed/<source>.xml), and are only imported once they have been selected. Disabled or skipped sources therefore cost nothing at
+startup. A scraper can be selected by its class name (AmazonScraper) or its
+module name (amazon), in any case.
+"""
+import importlib
+import os
+
+# Run order of the daily build
+SCRAPERS = [
+    ("OpenAIScraper", "scrapers.openai", "openai"),
+    ("NvidiaScraper", "scrapers.nvidia", "nvidia"),
+    ("GoogleAIScraper", "scrapers.google_ai", "google"),
+    ("AMDScraper", "scrapers.amd", "amd"),
+    ("PerplexityScraper", "scrapers.perplexity", "perplexity"),
+    ("PalantirScraper", "scrapers.palantir", "palantir"),
+    ("AmazonScraper", "scrapers.amazon", "amazon"),
+    ("ElevenLabsScraper", "scrapers.elevenlabs", "elevenlabs"),
+    ("AnthropicScraper", "scrapers.anthropic", "anthropic"),
+    ("ReallySimpleAIScraper", "scrapers.reallysimpleai", "reallysimpleai"),
+]
+
+_MODULES = {name: module for name, module, _ in SCRAPERS}
+_SOURCES = {name: source for name, _, source in SCRAPERS}
+
+def names():
+    return [name for name, _, _ in SCRAPERS]
+
+def sources(names):
+    """The feed names (feed/<source>.xml) of the given scrapers."""
+    return [_SOURCES[name] for name in names]
+
+def resolve(key):
+    """Returns the class name for a class or module name, or raises ValueError."""
+    key = key.strip().lower()
+    for name, module, _ in SCRAPERS:
+        if key in (name.lower(), module.rsplit(".", 1)[1]):
+            return name
+    raise ValueError(f"Unknown scraper {key!r}; known scrapers: {', '.join(names())}")
+
+def _split(value):
+    return [part for part in (value or "").split(",") if part.strip()]
+
+def select(only=None, skip=None):
+    """
+    Returns the names of the scrapers to run, in run order. only and skip are
+    comma-separated lists. DISABLED_SCRAPERS is applied on top of skip.
+    """
+    selected = [resolve(key) for key in _split(only)] if only else names()
+    skipped = {resolve(key) for key in _split(skip)}
+    for key in _split(os.environ.get("DISABLED_SCRAPERS", "")):
+        try:
+            skipped.add(resolve(key))
+        except ValueError:
+            pass  # an old or misspelled name in the environment should not stop the build
+    return [name for name in names() if name in selected and name not in skipped]
+
+def load(name):
+    """Imports the scraper's module and returns its class."""
+    return getattr(importlib.import_module(_MODULES[name]), name)
@@ -0,0 +1,187 @@
+"""
+Fetch scheduler shared by every scraper on an event loop.
+
+Each request waits for a slot before it is sent. A host gets a token bucket
+(HOST_RATE requests per second, bursts of HOST_BURST) and at most
+HOST_CONCURRENCY requests in flight. A Crawl-delay in the host's robots.txt
+lowers its rate to one request per delay. At most MAX_CONCURRENCY requests are
+in flight in total. Free slots go round-robin to the hosts with waiting
+requests, so a scraper with a long queue cannot starve the others.
+
+The scheduler belongs to an event loop, like the transport's sessions. With
+--jobs every worker process has its own, which is fine as long as each host
+is scraped by a single scraper.
+"""
+import asyncio
+import collections
+import contextlib
+import time
+import weakref
+from urllib.parse import urlsplit
+
+from scrapers import config
+
+_schedulers = weakref.WeakKeyDictionary()  # event loop -> Scheduler
+
+class HostLimiter:
+    """Token bucket and in-flight cap of one host."""
+
+    def __init__(self, rate, burst, concurrency):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.in_flight = 0
+        self.waiting = collections.deque()  # futures of queued requests, oldest first
+
+    def crawl_delay(self, seconds):
+        """Slows the host down to one request every `seconds`."""
+        self.rate = min(self.rate, 1 / seconds)
+        self.burst = 1
+        self.tokens = min(self.tokens, 1)
+
+    def delay(self, now):
+        """Seconds until a request may start, or None while the host is at its in-flight cap."""
+        if self.in_flight >= self.concurrency:
+            return None
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+        self.in_flight += 1
+
+class Scheduler:
+    """Hands out request slots per host, fairly across hosts."""
+
+    def __init__(self):
+        self.hosts = {}  # host -> HostLimiter
+        self.robots = {}  # host -> task reading the Crawl-delay
+        self.rotation = collections.deque()  # hosts with waiting requests
+        self.in_flight = 0
+        self._timer = None
+
+    def limiter(self, host):
+        limiter = self.hosts.get(host)
+        if limiter is None:
+            limiter = HostLimiter(config.HOST_RATE, config.HOST_BURST, config.HOST_CONCURRENCY)
+            self.hosts[host] = limiter
+        return limiter
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url):
+        """Waits until a request to url may be sent and holds the slot for the block."""
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        limiter = self.limiter(host)
+        if host not in self.robots:
+            self.robots[host] = asyncio.ensure_future(self._apply_robots(host, f"{parts.scheme}://{parts.netloc}/robots.txt"))
+        await asyncio.shield(self.robots[host])
+
+        granted = asyncio.get_running_loop().create_future()
+        limiter.waiting.append(granted)
+        if host not in self.rotation:
+            self.rotation.append(host)
+        self._dispatch()
+        try:
+            await granted
+        except asyncio.CancelledError:
+            if granted.done() and not granted.cancelled():
+                self._release(limiter)
+            raise
+        try:
+            yield
+        finally:
+            self._release(limiter)
+
+    async def _apply_robots(self, host, robots_url):
+        delay = await _read_crawl_delay(robots_url)
+        if delay:
+            print(f"{host}: robots.txt asks for a Crawl-delay of {delay:g}s")
+            self.hosts[host].crawl_delay(delay)
+
+    def _release(self, limiter):
+        limiter.in_flight -= 1
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Grants free slots round-robin, one per host per pass, and wakes up again for the next token."""
+        now = time.monotonic()
+        wake = None
+        granted = True
+        while granted and self.rotation and self.in_flight < config.MAX_CONCURRENCY:
+            granted = False
+            for _ in range(len(self.rotation)):
+                if self.in_flight >= config.MAX_CONCURRENCY:
+                    break
+                host = self.rotation[0]
+                self.rotation.rotate(-1)
+                limiter = self.hosts[host]
+                while limiter.waiting and limiter.waiting[0].done():
+                    limiter.waiting.popleft()  # cancelled while queued
+                if not limiter.waiting:
+                    self.rotation.remove(host)
+                    continue
+                delay = limiter.delay(now)
+                if delay == 0:
+                    limiter.take()
+                    self.in_flight += 1
+                    limiter.waiting.popleft().set_result(None)
+                    granted = True
+                elif delay is not None:
+                    wake = delay if wake is None else min(wake, delay)
+
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if wake is not None:
+            self._timer = asyncio.get_running_loop().call_later(wake, self._dispatch)
+
+def crawl_delay(robots_txt):
+    """
+    Returns the Crawl-delay of the `User-agent: *` group of a robots.txt, or None.
+    We send a browser's User-Agent, so that is the group that applies to us.
+    (urllib.robotparser only understands whole seconds.)
+    """
+    agents, delays, in_rules = [], {}, False
+    for line in robots_txt.splitlines():
+        field, _, value = line.split("#", 1)[0].partition(":")
+        field, value = field.strip().lower(), value.strip()
+        if field == "user-agent":
+            if in_rules:
+                agents, in_rules = [], False
+            agents.append(value)
+        elif field:
+            in_rules = True
+            if field == "crawl-delay":
+                try:
+                    delays.update(dict.fromkeys(agents, float(value)))
+                except ValueError:
+                    pass
+    delay = delays.get("*")
+    return delay if delay and delay > 0 else None
+
+async def _read_crawl_delay(url):
+    """Fetches robots.txt at url and returns its Crawl-delay. Errors count as no delay."""
+    from scrapers import transport
+
+    try:
+        response = await transport.get_session(url).get(transport.request_url(url))
+    except Exception:
+        return None
+    return crawl_delay(response.text) if response.status_code == 200 else None
+
+def get_scheduler():
+    """Returns the scheduler of the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = Scheduler()
+        _schedulers[loop] = scheduler
+    return scheduler
+
+def slot(url):
+    return get_scheduler().slot(url)
@@ -0,0 +1,130 @@
+"""
+Persistent article store keyed by GUID.
+
+Scrapers keep the result of each article-page fetch here (SQLite, in
+CACHE_DIR/articles.sqlite3) together with a fingerprint of what the listing
+page or upstream RSS said about the article. On the next run, an article whose
+fingerprint is unchanged is served from the store instead of being fetched and
+extracted again. Articles are fetched again when they are new, when their
+listing fingerprint changes, when they have been marked as changed, or for
+every article when REFRESH_ARTICLES is set (run_feeds.py --refresh).
+
+Usage: python -m scrapers.store mark-changed <guid> [<guid> ...]
+"""
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+
+from scrapers import config, metrics, transport
+from scrapers.concurrency import fetch_all
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    guid TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    fingerprint TEXT,
+    details TEXT NOT NULL,
+    fetched_at TEXT NOT NULL
+)
+"""
+
+def db_path():
+    return os.path.join(config.CACHE_DIR, "articles.sqlite3")
+
+def connect():
+    os.makedirs(config.CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(db_path(), timeout=30)
+    conn.execute(SCHEMA)
+    return conn
+
+def _encode(value):
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Cannot store {type(value).__name__}")
+
+def _decode(obj):
+    if "__datetime__" in obj:
+        return datetime.datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+def fingerprint_of(value):
+    """Stable hash of listing-level data (title, excerpt, ...) used to detect changed articles."""
+    if value is None:
+        return None
+    data = json.dumps(value, default=_encode, sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+class ArticleStore:
+    def __init__(self, source):
+        self.source = source
+        self.conn = connect()
+
+    def get(self, guid, fingerprint=None):
+        """Returns the stored details for guid, or None if the article must be fetched."""
+        if config.REFRESH_ARTICLES:
+            return None
+        row = self.conn.execute("SELECT fingerprint, details FROM articles WHERE guid = ?", (guid,)).fetchone()
+        if row is None:
+            return None
+        stored_fingerprint, details = row
+        if stored_fingerprint != fingerprint:
+            return None
+        return json.loads(details, object_hook=_decode)
+
+    def put(self, guid, details, fingerprint=None):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO articles (guid, source, fingerprint, details, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (guid, self.source, fingerprint, json.dumps(details, default=_encode),
+             datetime.datetime.now(datetime.timezone.utc).isoformat())
+        )
+        self.conn.commit()
+
+    async def fetch_all(self, fetch, entries, key, fingerprint=None):
+        """
+        Like concurrency.fetch_all, but only calls fetch for entries that are
+        new or changed. key(entry) gives the GUID and fingerprint(entry) the
+        listing data to compare against. Results that are not None are stored
+        for the next run. Results are returned in input order. Connections to
+        the hosts of the entries to fetch are opened ahead of the burst.
+        """
+        entries = list(entries)
+        results = [None] * len(entries)
+        fingerprints = [fingerprint_of(fingerprint(entry)) if fingerprint else None for entry in entries]
+
+        missing = []
+        for i, entry in enumerate(entries):
+            details = self.get(key(entry), fingerprints[i])
+            if details is None:
+                missing.append(i)
+            else:
+                results[i] = details
+
+        print(f"{self.source}: {len(entries) - len(missing)} articles from store, {len(missing)} to fetch")
+        metrics.end_discovery()
+        metrics.add("store_hits", len(entries) - len(missing))
+
+        # The GUIDs are the article URLs
+        await transport.prewarm([key(entries[i]) for i in missing if key(entries[i]).startswith(("http://", "https://"))])
+        fetched = await fetch_all(fetch, [entries[i] for i in missing])
+        for i, details in zip(missing, fetched):
+            results[i] = details
+            if details is not None:
+                self.put(key(entries[i]), details, fingerprints[i])
+
+        return results
+
+def mark_changed(guids):
+    """Forces the given articles to be fetched again on the next run."""
+    conn = connect()
+    with conn:
+        conn.executemany("UPDATE articles SET fingerprint = 'changed' WHERE guid = ?", [(guid,) for guid in guids])
+    conn.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "mark-changed":
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(2)
+    mark_changed(sys.argv[2:])
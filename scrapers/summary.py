@@ -0,0 +1,130 @@
+"""
+Summaries for the summary variant of each feed.
+
+The scrapers put whole articles into the item descriptions. feed/<source>.xml
+gets a summary of each description and feed/<source>-full.xml the full text.
+Both are written from the same rfeed.Feed, so every article is only extracted
+once.
+
+A summary keeps whole paragraphs while they fit into SUMMARY_MAX_BYTES (UTF-8)
+and, when SUMMARY_SENTENCES is set, into that many sentences. If not even the
+first paragraph fits, it is cut at the last word that does. A cut summary ends
+with an ellipsis. HTML descriptions are reduced to their paragraphs and list
+items, so tags are never cut in half. FEED_MAX_BYTES caps the sum of the
+summaries of one feed; newer items come first, and the items past the cap are
+only in the full variant.
+"""
+import copy
+import html
+import re
+
+from bs4 import BeautifulSoup
+
+from scrapers import config
+
+ELLIPSIS = "…"
+
+_TAG = re.compile(r"<[a-zA-Z][^>]*>")
+_BLOCKS = ["p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre"]
+# A sentence ends with . ! or ? followed by whitespace and an upper-case letter, digit or quote
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'“(])")
+
+def full_path(path):
+    """feed/amazon.xml -> feed/amazon-full.xml"""
+    base, extension = path.rsplit(".", 1)
+    return f"{base}-full.{extension}"
+
+def _size(text):
+    return len(text.encode("utf-8"))
+
+def paragraphs(description):
+    """(paragraphs, is_html) of a description, as plain text."""
+    if not _TAG.search(description):
+        return [part.strip() for part in re.split(r"\n\s*\n", description) if part.strip()], False
+    soup = BeautifulSoup(description, "lxml")
+    # Only innermost blocks, so a <li> inside a <blockquote> is not counted twice
+    blocks = [block for block in soup.find_all(_BLOCKS) if not block.find(_BLOCKS)]
+    parts = [block.get_text(" ", strip=True) for block in blocks] or [soup.get_text(" ", strip=True)]
+    soup.decompose()
+    return [part for part in parts if part], True
+
+def _sentences(parts, limit):
+    """The first limit sentences of parts, keeping the paragraphs. Returns (parts, cut)."""
+    kept = []
+    for part in parts:
+        sentences = _SENTENCE_END.split(part)
+        if len(sentences) >= limit:
+            kept.append(" ".join(sentences[:limit]))
+            return kept, len(sentences) > limit or len(kept) < len(parts)
+        kept.append(part)
+        limit -= len(sentences)
+    return kept, False
+
+def _cut(text, budget):
+    """text cut at the last word boundary that fits into budget bytes, with an ellipsis."""
+    budget -= _size(ELLIPSIS)
+    cut = text.encode("utf-8")[:max(budget, 0)].decode("utf-8", "ignore")
+    if len(cut) < len(text) and not text[len(cut)].isspace() and " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(" ,;:-") + ELLIPSIS
+
+def _mark(text):
+    # "end." -> "end. …", "mid-sentence" -> "mid-sentence…"
+    return text + (" " + ELLIPSIS if text.endswith((".", "!", "?")) else ELLIPSIS)
+
+def _render(parts, is_html, cut):
+    if cut:
+        parts = parts[:-1] + [_mark(parts[-1])]
+    if is_html:
+        return "".join(f"<p>{html.escape(part, quote=False)}</p>" for part in parts)
+    return "\n\n".join(parts)
+
+def summarize(description, max_bytes=None, sentences=None):
+    """Summary of an item description (plain text or HTML) within the budgets. See the module docstring."""
+    max_bytes = config.SUMMARY_MAX_BYTES if max_bytes is None else max_bytes
+    sentences = config.SUMMARY_SENTENCES if sentences is None else sentences
+    if not description or (not sentences and (not max_bytes or _size(description) <= max_bytes)):
+        return description
+
+    parts, is_html = paragraphs(description)
+    if not parts:
+        return ""
+    cut = False
+    if sentences:
+        parts, cut = _sentences(parts, sentences)
+    if not max_bytes:
+        return _render(parts, is_html, cut)
+
+    # Whole paragraphs while they fit, counting the separators and the ellipsis
+    separator = 0 if is_html else _size("\n\n")
+    total = -separator
+    kept = 0
+    for part in parts:
+        total += _size(_render([part], is_html, False)) + separator
+        more = cut or kept + 1 < len(parts)
+        if total + (_size(_mark(part)) - _size(part) if more else 0) > max_bytes:
+            break
+        kept += 1
+    if kept == len(parts):
+        return _render(parts, is_html, cut)
+    if kept:
+        return _render(parts[:kept], is_html, True)
+    # Not even the first paragraph fits; cut it on a word boundary (inside its <p>)
+    overhead = _size(_render([""], is_html, False))
+    return _render([_cut(parts[0], max_bytes - overhead)], is_html, False)
+
+def summarized(feed):
+    """A copy of feed (an rfeed.Feed) with summarized descriptions, within FEED_MAX_BYTES."""
+    items = []
+    total = 0
+    for item in feed.items:
+        summary = copy.copy(item)
+        if item.description:
+            summary.description = summarize(item.description)
+            total += _size(summary.description)
+            if config.FEED_MAX_BYTES and total > config.FEED_MAX_BYTES and items:
+                break
+        items.append(summary)
+    result = copy.copy(feed)
+    result.items = items
+    return result
@@ -0,0 +1,118 @@
+"""
+Chrome / Perfetto trace-event export of a run (run_feeds.py --trace FILE).
+
+Each scraper gets its own track with a span for the whole scraper and spans
+for every parse, extraction and feed write. HTTP requests are async events on
+the same track, named after the host and carrying the URL, status and size.
+Overlapping requests therefore show up side by side. Open the file in
+chrome://tracing or https://ui.perfetto.dev.
+
+Timestamps are wall-clock microseconds, so tracks from --jobs worker
+processes line up. Like the metrics, each scraper's events are saved under
+CACHE_DIR/trace when it finishes and merged into TRACE_PATH by write().
+"""
+import contextlib
+import contextvars
+import itertools
+import json
+import os
+import time
+import zlib
+from urllib.parse import urlsplit
+
+from scrapers import config
+
+_track = contextvars.ContextVar("trace_track", default=None)
+_events = {}  # scraper name -> events
+_ids = itertools.count(1)
+
+def _now():
+    return time.time_ns() // 1000
+
+def _tid(name):
+    return zlib.crc32(name.encode("utf-8")) & 0xFFFF
+
+def _event(name, **fields):
+    track = _track.get()
+    if track is None:
+        return None
+    event = {"name": name, "pid": os.getpid(), "tid": _tid(track), **fields}
+    _events[track].append(event)
+    return event
+
+@contextlib.contextmanager
+def span(name, category, **args):
+    """A complete event on the current scraper's track. Does nothing outside a traced scraper."""
+    if _track.get() is None:
+        yield
+        return
+    start = _now()
+    try:
+        yield
+    finally:
+        _event(name, cat=category, ph="X", ts=start, dur=_now() - start, args=args)
+
+@contextlib.contextmanager
+def http(url):
+    """
+    An async event for one HTTP request. Yields a dict the caller fills with
+    the status and size of the response.
+    """
+    details = {}
+    if _track.get() is None:
+        yield details
+        return
+    request_id = next(_ids)
+    host = urlsplit(url).netloc
+    _event(host, cat="http", ph="b", id2={"local": request_id}, ts=_now(), args={"url": url})
+    try:
+        yield details
+    finally:
+        _event(host, cat="http", ph="e", id2={"local": request_id}, ts=_now(), args=details)
+
+@contextlib.contextmanager
+def scraper(name):
+    """Traces the block as scraper name, on its own track, when TRACE_PATH is set."""
+    if not config.TRACE_PATH:
+        yield
+        return
+    _events[name] = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": _tid(name),
+                      "args": {"name": name}}]
+    token = _track.set(name)
+    try:
+        with span(name, "scraper"):
+            yield
+    finally:
+        _track.reset(token)
+        _save(name, _events.pop(name))
+
+def _partial_dir():
+    return os.path.join(config.CACHE_DIR, "trace")
+
+def _save(name, events):
+    os.makedirs(_partial_dir(), exist_ok=True)
+    with open(os.path.join(_partial_dir(), f"{name}.json"), "w", encoding="utf-8") as f:
+        json.dump(events, f)
+
+def clear_partials():
+    """Removes events left over from an interrupted run."""
+    if os.path.isdir(_partial_dir()):
+        for entry in os.scandir(_partial_dir()):
+            os.remove(entry.path)
+
+def write(names, path=None):
+    """Merges the saved events of the named scrapers into one trace file."""
+    path = path or config.TRACE_PATH
+    events = []
+    for name in names:
+        partial = os.path.join(_partial_dir(), f"{name}.json")
+        try:
+            with open(partial, "r", encoding="utf-8") as f:
+                events.extend(json.load(f))
+            os.remove(partial)
+        except (OSError, ValueError):
+            pass
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    print(f"Wrote trace with {len(events)} events to {path}")
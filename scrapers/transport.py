@@ -0,0 +1,176 @@
+"""
+Pooled async HTTP transport shared by all scrapers.
+
+Requests go through curl_cffi's AsyncSession impersonating Chrome, which gets
+us past the Cloudflare checks on Perplexity, Amazon, OpenAI and ElevenLabs.
+
+Sessions are handed out per host and kept for the lifetime of the event loop,
+so every scraper running on that loop reuses the same keep-alive connections.
+Each session negotiates HTTP/2 where the server supports it, waits to multiplex
+over an existing connection instead of opening new ones, and caches DNS
+lookups for the whole run. prewarm() opens connections to new hosts ahead of a
+burst of requests. Every request first waits for a slot from the fetch
+scheduler (scrapers.scheduler), which rate-limits each host and is fair
+across hosts. Failed requests are retried with backoff and each host has a
+circuit breaker (scrapers.fetchpolicy). GET requests are revalidated against the on-disk cache in
+scrapers.httpcache, and can be recorded to or replayed from a cassette
+(scrapers.cassette).
+"""
+import asyncio
+import time
+import weakref
+from urllib.parse import urlsplit
+
+from curl_cffi import CurlHttpVersion, CurlOpt
+from curl_cffi.requests import AsyncSession
+from curl_cffi.requests.exceptions import RequestException
+
+from scrapers import cassette, config, deadline, fetchpolicy, httpcache, metrics, scheduler, trace
+
+IMPERSONATE = "chrome"
+
+# Keep resolved addresses for the whole run instead of libcurl's default 60s.
+DNS_CACHE_SECONDS = 3600
+
+_sessions = weakref.WeakKeyDictionary()  # event loop -> {host: AsyncSession}
+
+def _host(url):
+    return urlsplit(url).netloc.lower()
+
+def _new_session():
+    headers = {"User-Agent": config.USER_AGENT} if config.USER_AGENT else None
+    return AsyncSession(
+        impersonate=IMPERSONATE,
+        headers=headers,
+        timeout=(config.CONNECT_TIMEOUT, config.READ_TIMEOUT),
+        max_clients=config.HOST_MAX_CONNECTIONS,
+        http_version=CurlHttpVersion.V2TLS,
+        curl_options={
+            CurlOpt.DNS_CACHE_TIMEOUT: DNS_CACHE_SECONDS,
+            CurlOpt.PIPEWAIT: 1,
+            CurlOpt.TCP_KEEPALIVE: 1,
+        },
+    )
+
+def get_session(url):
+    """Returns the session for url's host on the running event loop, creating it on first use."""
+    sessions = _sessions.setdefault(asyncio.get_running_loop(), {})
+    host = _host(url)
+    session = sessions.get(host)
+    if session is None:
+        session = _new_session()
+        sessions[host] = session
+    return session
+
+def request_url(url):
+    """Where a request for url is sent: url itself, or the stand-in server when replaying."""
+    return cassette.replay_url(url) if config.REPLAY_SERVER else url
+
+def is_warm(url):
+    """Whether a session (and so usually a live connection) already exists for url's host."""
+    return _host(url) in _sessions.get(asyncio.get_running_loop(), {})
+
+async def _send(url, **kwargs):
+    """One attempt at a request: waits for a scheduler slot, then sends it. Returns (response, seconds)."""
+    # Sessions and rate limits stay per origin host when replaying, so they behave as live
+    queued = time.perf_counter()
+    async with scheduler.slot(url):
+        started = time.perf_counter()
+        with metrics.stage("fetch"), trace.http(url) as traced:
+            response = await get_session(url).get(request_url(url), **kwargs)
+            traced.update(status=response.status_code, bytes=len(response.content),
+                          queued_ms=round((started - queued) * 1000, 1))
+        return response, time.perf_counter() - started
+
+async def get(url, **kwargs):
+    """
+    Performs a GET request and returns the curl_cffi response.
+    If the URL is cached, the request is made conditional and a 304 answer
+    is returned as the cached response instead. While recording, the cache is
+    bypassed so that the cassette gets full responses.
+    Failed attempts are retried as described in scrapers.fetchpolicy; raises
+    CircuitOpenError (a RequestException) while the host's breaker is open.
+    """
+    cached = None if config.RECORD_DIR else httpcache.lookup(url)
+    if cached:
+        meta, body = cached
+        kwargs["headers"] = {**httpcache.conditional_headers(meta), **(kwargs.get("headers") or {})}
+
+    # The breaker counts requests, not attempts: a request is checked once and
+    # counts as one failure when its retries are used up
+    fetchpolicy.check(url)
+    attempt = 0
+    while True:
+        try:
+            response, elapsed = await _send(url, **kwargs)
+        except RequestException as e:
+            delay = fetchpolicy.backoff(attempt)
+            if attempt >= config.FETCH_RETRIES or deadline.near(delay):
+                fetchpolicy.failed(url, e.__class__.__name__)
+                raise
+            print(f"Retrying {url} in {delay:.1f}s after {e.__class__.__name__}")
+        else:
+            if not fetchpolicy.is_retryable(response):
+                break
+            delay = fetchpolicy.retry_delay(response, attempt)
+            if attempt >= config.FETCH_RETRIES or delay is None or deadline.near(delay):
+                break
+            metrics.request(elapsed, len(response.content))
+            print(f"Retrying {url} in {delay:.1f}s after HTTP {response.status_code}")
+        metrics.add("retries")
+        attempt += 1
+        await asyncio.sleep(delay)
+
+    if fetchpolicy.is_failure(response):
+        fetchpolicy.failed(url, f"HTTP {response.status_code}")
+    else:
+        fetchpolicy.succeeded(url)
+
+    if config.RECORD_DIR:
+        cassette.record(url, response, elapsed)
+
+    if cached and response.status_code == 304:
+        metrics.request(elapsed, 0, cache_hit=True)
+        return httpcache.hit(url, meta, body)
+    metrics.request(elapsed, len(response.content))
+    httpcache.store(url, response)
+    return response
+
+async def prewarm(urls):
+    """
+    Opens a connection to every host in urls that has none yet, concurrently.
+    Failures are ignored; the real request will report them.
+    """
+    origins = {}
+    for url in urls:
+        if not is_warm(url):
+            parts = urlsplit(url)
+            origins.setdefault(_host(url), f"{parts.scheme}://{parts.netloc}/")
+
+    async def warm(origin):
+        try:
+            async with scheduler.slot(origin):
+                await get_session(origin).head(request_url(origin))
+        except RequestException:
+            pass
+
+    await asyncio.gather(*(warm(origin) for origin in origins.values()))
+
+async def close():
+    """Closes the sessions of the running event loop."""
+    sessions = _sessions.pop(asyncio.get_running_loop(), {})
+    for session in sessions.values():
+        await session.close()
+
+def run(coro):
+    """
+    Runs a coroutine to completion on a new event loop and closes its HTTP sessions.
+    This is what the synchronous generate_feed() wrappers use.
+    """
+    async def main():
+        try:
+            return await coro
+        finally:
+            await close()
+
+    return asyncio.run(main())